@@ -1,65 +1,103 @@
-from texttosql import TextToSQLModel
+from texttosql import TextToSQLModel, model_files_mtime
 import os
-import datetime
-import json
-import glob
+from datetime import datetime
+import shutil
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def get_latest_model():
-    """Find the most recently created model directory"""
+try:
+    import readline
+except ImportError:
+    # readline is not available on every platform (e.g. Windows)
+    readline = None
+
+HISTORY_FILE = os.path.expanduser("~/.sql_console_history")
+HISTORY_LENGTH = 1000  # entries kept in HISTORY_FILE
+
+def _setup_history():
+    """Enable line editing and persist input history across sessions"""
+    if readline is None:
+        return
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    # Bound the history, which would otherwise grow by every session's input
+    readline.set_history_length(HISTORY_LENGTH)
+    atexit.register(readline.write_history_file, HISTORY_FILE)
+
+# Cached result of _scan_model_dirs(); reset by _invalidate_model_dirs()
+_MODEL_DIR_CACHE = None
+
+def _scan_model_dirs():
+    """Scan the working directory once for model directories.
+
+    Returns (time, priority, model_path, name) tuples. time is when the model's files
+    were last written; model_path is None for a results directory without a
+    final_model (e.g. an interrupted training run).
+    """
     model_dirs = []
 
-    base_paths = [
-        ("./text_to_sql_results/final_model", 1),  # Non-timestamped directory
-        ("./text_to_sql_results_*/final_model", 0),  # Timestamped directories
-        ("./text_to_sql_model", -1)  # Standard directory
-    ]
+    with os.scandir('./') as entries:
+        for entry in entries:
+            if entry.name == "text_to_sql_model":
+                # Standard directory
+                model_path, base_priority = entry.path, -1
+            elif entry.name == "text_to_sql_results":
+                # Non-timestamped directory
+                model_path, base_priority = f"{entry.path}/final_model", 1
+            elif entry.name.startswith("text_to_sql_results_"):
+                # Timestamped directories
+                model_path, base_priority = f"{entry.path}/final_model", 0
+            else:
+                continue
 
-    # Collect all available model directories
-    for pattern, base_priority in base_paths:
-        if "*" in pattern:
-            # Handle wildcard patterns
-            for dir_path in glob.glob(pattern):
-                if os.path.exists(dir_path):
-                    mtime = os.path.getmtime(dir_path)
-                    model_dirs.append({
-                        "path": dir_path,
-                        "time": mtime,
-                        "priority": base_priority
-                    })
-        else:
-            # Handle direct paths
-            if os.path.exists(pattern):
-                mtime = os.path.getmtime(pattern)
-                model_dirs.append({
-                    "path": pattern,
-                    "time": mtime,
-                    "priority": base_priority
-                })
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+
+            try:
+                # The files inside change on retraining, the directory mtime does not
+                mtime = model_files_mtime(model_path)
+            except OSError:
+                model_path = None
+                mtime = entry.stat().st_mtime
+
+            model_dirs.append((mtime, base_priority, model_path, entry.name))
+
+    return model_dirs
+
+def _list_model_dirs():
+    """Return the cached model directory scan, scanning on first use"""
+    global _MODEL_DIR_CACHE
+    if _MODEL_DIR_CACHE is None:
+        _MODEL_DIR_CACHE = _scan_model_dirs()
+    return _MODEL_DIR_CACHE
+
+def _invalidate_model_dirs():
+    """Forget the cached scan after model directories were created or removed"""
+    global _MODEL_DIR_CACHE
+    _MODEL_DIR_CACHE = None
+
+def _latest_model_entry():
+    """(mtime, priority, path) of the most recently written model, or None"""
+    model_dirs = [(mtime, priority, path) for mtime, priority, path, _ in _list_model_dirs() if path]
 
     if not model_dirs:
         return None
 
-    # First, find the most recent modification time
-    latest_time = max(d["time"] for d in model_dirs)
-    
-    # Consider a model "current" if it's within 5 seconds of the latest modification
-    RECENCY_THRESHOLD = 5  # seconds
-    current_models = [d for d in model_dirs 
-                     if latest_time - d["time"] <= RECENCY_THRESHOLD]
-    
-    # If we have multiple "current" models, use priority as tiebreaker
-    # Otherwise, just use the most recent one
-    if current_models:
-        return sorted(current_models, 
-                     key=lambda x: (x["time"], x["priority"]), 
-                     reverse=True)[0]["path"]
-    
-    # Fallback to most recent if no models are "current"
-    return sorted(model_dirs, 
-                 key=lambda x: x["time"], 
-                 reverse=True)[0]["path"]
+    # Tuples compare element-wise with no key callback: the newest mtime wins and
+    # priority only breaks exact ties (folding both into one number would not)
+    return max(model_dirs)
+
+def get_latest_model():
+    """Find the most recently created model directory"""
+    latest = _latest_model_entry()
+    return latest[2] if latest else None
 
 def interactive_mode():
+    _setup_history()
+    
     # Initialize the model
     text_to_sql = TextToSQLModel()
     
@@ -73,56 +111,30 @@ def interactive_mode():
     text_to_sql.load_model(model_path)
     print("Model loaded successfully!")
     
-    print("\n=== Text-to-SQL Converter ===")
-    print("Type your questions in natural language, and I'll convert them to SQL.")
-    print("Type 'exit' to quit, 'help' for examples, 'stats' for performance stats, 'retrain' to retrain the model, 'cleanup' to remove old models.")
+    print("\n=== Text-to-SQL Converter ===\n"
+          "Type your questions in natural language, and I'll convert them to SQL.\n"
+          "Type 'exit' to quit, 'help' for examples, 'stats' for performance stats, 'retrain' to retrain the model, 'cleanup' to remove old models.")
     
     while True:
         print("\n" + "-" * 50)
-        question = input("Enter your question: ")
+        # Normalise the input once; the stripped text is what gets used from here on
+        question = input("Enter your question: ").strip()
         
-        if question.lower() == 'exit':
-            print("Goodbye!")
-            break
-            
-        if question.lower() == 'help':
-            show_examples()
-            continue
-            
-        if question.lower() == 'stats':
-            show_stats(text_to_sql)
-            continue
-            
-        if question.lower() == 'retrain':
-            retrain_model(text_to_sql)
+        handler = COMMANDS.get(question.casefold())
+        if handler:
+            if handler(text_to_sql):
+                break
             continue
             
-        if question.lower() == 'cleanup':
-            cleanup_old_models()
-            continue
-            
-        if question.lower() == 'sync':
-            # Force a sync with the latest model
-            latest_model = get_latest_model()
-            if latest_model:
-                print(f"Syncing with latest model: {latest_model}")
-                text_to_sql.load_model(latest_model)
-                print("Model synced successfully!")
-            else:
-                print("No models found to sync with.")
-            continue
-            
-        if not question.strip():
+        if not question:
             print("Please enter a question.")
             continue
         
         print("Generating SQL...")
         sql_query = text_to_sql.generate_sql(question)
         
-        print("\nGenerated SQL:")
-        print("-" * 50)
-        print(sql_query)
-        print("-" * 50)
+        separator = "-" * 50
+        print(f"\nGenerated SQL:\n{separator}\n{sql_query}\n{separator}", flush=True)
         
         # Ask if the SQL is correct
         feedback = input("\nIs this SQL correct? (y/n): ")
@@ -145,6 +157,36 @@ def interactive_mode():
             # If the SQL is correct, do not add to feedback
             print("Great! Thanks for the feedback. No changes will be made to the feedback data.")
 
+def _cmd_exit(text_to_sql):
+    print("Goodbye!")
+    return True
+
+def _cmd_help(text_to_sql):
+    show_examples()
+
+def _cmd_stats(text_to_sql):
+    show_stats(text_to_sql)
+
+def _cmd_retrain(text_to_sql):
+    retrain_model(text_to_sql)
+
+def _cmd_cleanup(text_to_sql):
+    cleanup_old_models()
+
+def _cmd_sync(text_to_sql):
+    # Force a sync with the latest model, rescanning in case it was trained elsewhere
+    _invalidate_model_dirs()
+    latest = _latest_model_entry()
+    latest_model = latest[2] if latest else None
+    if latest_model and text_to_sql.loaded_model == (latest_model, latest[0]):
+        print(f"Already synced with latest model: {latest_model}")
+    elif latest_model:
+        print(f"Syncing with latest model: {latest_model}")
+        text_to_sql.load_model(latest_model)
+        print("Model synced successfully!")
+    else:
+        print("No models found to sync with.")
+
 def show_examples():
     examples = [
         "Give me all part numbers created by ER code ABC123",
@@ -154,86 +196,137 @@ def show_examples():
         "List all parts and their suppliers"
     ]
     
-    print("\nExample questions you can ask:")
-    for i, example in enumerate(examples, 1):
-        print(f"{i}. {example}")
+    # Build the whole block and write it once
+    lines = ["\nExample questions you can ask:"]
+    lines.extend(f"{i}. {example}" for i, example in enumerate(examples, 1))
+    print("\n".join(lines))
 
 def show_stats(text_to_sql):
     """Display performance statistics"""
     stats = text_to_sql.analyze_performance()
+    metrics, feedback_stats, error_patterns = stats['metrics'], stats['feedback_stats'], stats['error_patterns']
     
-    print("\n=== Performance Statistics ===")
-    print(f"Total queries: {stats['metrics']['total_queries']}")
-    print(f"Pattern matched: {stats['metrics']['pattern_matched']}")
-    print(f"Model generated: {stats['metrics']['model_generated']}")
-    print(f"User corrected: {stats['metrics']['user_corrected']}")
-    print(f"Success rate: {stats['metrics']['success_rate']*100:.1f}%")
-    
-    print("\n=== Feedback Statistics ===")
-    print(f"Total corrections: {stats['feedback_stats']['total_corrections']}")
-    print(f"Total examples: {stats['feedback_stats']['total_examples']}")
+    # Build the whole report and write it once
+    lines = [
+        "\n=== Performance Statistics ===",
+        f"Total queries: {metrics['total_queries']}",
+        f"Pattern matched: {metrics['pattern_matched']}",
+        f"Model generated: {metrics['model_generated']}",
+        f"User corrected: {metrics['user_corrected']}",
+        f"Success rate: {metrics['success_rate']*100:.1f}%",
+        "\n=== Feedback Statistics ===",
+        f"Total corrections: {feedback_stats['total_corrections']}",
+        f"Total examples: {feedback_stats['total_examples']}"
+    ]
     
-    if stats['feedback_stats']['last_retrained']:
-        print(f"Last retrained: {stats['feedback_stats']['last_retrained']}")
+    if feedback_stats['last_retrained']:
+        lines.append(f"Last retrained: {feedback_stats['last_retrained']}")
     else:
-        print("Model has not been retrained yet")
+        lines.append("Model has not been retrained yet")
+    
+    if error_patterns:
+        lines.append("\n=== Common Error Patterns ===")
+        lines.extend(f"{pattern}: {count} occurrences" for pattern, count in error_patterns.items())
     
-    if stats['error_patterns']:
-        print("\n=== Common Error Patterns ===")
-        for pattern, count in stats['error_patterns'].items():
-            print(f"{pattern}: {count} occurrences")
+    print("\n".join(lines))
+
+def _evaluate_in_background(text_to_sql, model_path):
+    """Evaluate the model saved at model_path on the test dataset and report the accuracy when done"""
+    try:
+        # A separate instance, so evaluation neither shares the console's model with its
+        # queries (or a load_model swapping it) nor counts towards its stats
+        eval_model = TextToSQLModel(
+            model_name=text_to_sql.model_name,
+            max_input_length=text_to_sql.max_input_length,
+            max_target_length=text_to_sql.max_target_length,
+            feedback_file=text_to_sql.feedback_file,
+            enable_logging=False,
+            precision=text_to_sql.precision
+        )
+        eval_model.schema = text_to_sql.schema
+        # Not compiled: compiling and warming up would cost more than a single evaluation
+        # gains, and would compete with the console's own model for the GPU
+        eval_model.load_model(model_path, compile=False)
+        eval_results = eval_model.evaluate_model(eval_model.load_data()["test"])
+    except Exception as e:
+        print(f"\n[eval] Evaluation failed: {e}")
+        return
+    print(f"\n[eval] Model accuracy after retraining: {eval_results['accuracy']:.2f}")
 
 def retrain_model(text_to_sql):
     """Retrain the model with feedback data"""
     print("\nRetraining model with feedback data...")
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     output_dir = f"./text_to_sql_results_{timestamp}"
     
     success = text_to_sql.retrain_from_feedback(output_dir=output_dir)
     
+    # A new model directory may exist now, so drop cached scan results
+    _invalidate_model_dirs()
+    
     if success:
         # Update the last_retrained timestamp in feedback data
-        text_to_sql.feedback_data["metadata"]["last_retrained"] = datetime.datetime.now().isoformat()
+        text_to_sql.feedback_data["metadata"]["last_retrained"] = now.isoformat()
         text_to_sql._save_feedback_data()
         
         print(f"Model successfully retrained and saved to {output_dir}/final_model")
         
-        # Evaluate the model on the test dataset
-        eval_results = text_to_sql.evaluate_model(text_to_sql.load_data()["test"])
-        print(f"Model accuracy after retraining: {eval_results['accuracy']:.2f}")
+        # Evaluate the model on the test dataset in the background so the console stays responsive
+        print("Evaluating the retrained model in the background...")
+        threading.Thread(target=_evaluate_in_background, args=(text_to_sql, f"{output_dir}/final_model"), daemon=True).start()
         
         print("Would you like to load the new model now? (y/n)")
         if input("> ").lower() == 'y':
-            text_to_sql.load_model(os.path.join(output_dir, "final_model"))
+            text_to_sql.load_model(f"{output_dir}/final_model")
             print("New model loaded successfully!")
     else:
         print("Retraining failed or no feedback data available.")
 
+def _remove_dir(path):
+    """Remove a directory tree, returning (path, error) instead of raising"""
+    try:
+        shutil.rmtree(path)
+    except Exception as e:
+        return path, e
+    return path, None
+
 def cleanup_old_models():
     """Delete old model directories to save space"""
     print("\nCleaning up old model directories...")
     
-    # Get all directories that match the pattern
-    model_dirs = [d for d in os.listdir("./") if d.startswith("text_to_sql_results_")]
+    # Timestamped results directories, with their mtimes from the shared scan
+    model_dirs = [(name, path is not None, mtime) for mtime, priority, path, name in _list_model_dirs() if priority == 0]
     
-    # Sort by timestamp (newest first)
-    model_dirs.sort(reverse=True)
+    if len(model_dirs) < 2:
+        print("No model directories found to clean up.")
+        return
+    
+    # Sort newest first, preferring directories that contain a final model
+    model_dirs.sort(key=lambda d: (d[1], d[2]), reverse=True)
     
     # Keep the most recent one
-    if model_dirs and len(model_dirs) > 1:
-        print(f"Keeping most recent model: {model_dirs[0]}")
-        for old_dir in model_dirs[1:]:
-            print(f"Removing old model directory: {old_dir}")
-            try:
-                import shutil
-                shutil.rmtree(old_dir)
-            except Exception as e:
-                print(f"Error removing directory {old_dir}: {e}")
-    else:
-        print("No model directories found to clean up.")
+    print(f"Keeping most recent model: {model_dirs[0][0]}")
+    old_dirs = [old_dir for old_dir, _, _ in model_dirs[1:]]
+    for old_dir in old_dirs:
+        print(f"Removing old model directory: {old_dir}")
+    
+    # Delete in parallel; rmtree spends its time in unlink syscalls, which release the GIL
+    with ThreadPoolExecutor(max_workers=min(8, len(old_dirs))) as executor:
+        for old_dir, error in executor.map(_remove_dir, old_dirs):
+            if error:
+                print(f"Error removing directory {old_dir}: {error}")
+    _invalidate_model_dirs()
+
+# Console commands; a handler returning True ends the session
+COMMANDS = {
+    'exit': _cmd_exit,
+    'help': _cmd_help,
+    'stats': _cmd_stats,
+    'retrain': _cmd_retrain,
+    'cleanup': _cmd_cleanup,
+    'sync': _cmd_sync
+}
 
 if __name__ == "__main__":
     interactive_mode()
-
-
-
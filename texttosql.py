@@ -1,11 +1,29 @@
 import os
 import torch
-import pandas as pd
 import numpy as np
 import re
+import csv
 import logging
+import logging.handlers
+import atexit
+import queue
+import time
 import datetime
 import json
+import hashlib
+import functools
+from dataclasses import dataclass, asdict
+from collections import Counter
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the (slower) stdlib json module
+    orjson = None
+try:
+    import re2
+except ImportError:
+    # google-re2 is optional; schema-derived regexes fall back to the re module
+    re2 = None
 from sklearn.model_selection import train_test_split
 from transformers import (
     AutoModelForSeq2SeqLM, 
@@ -15,83 +33,406 @@ from transformers import (
     DataCollatorForSeq2Seq,
     EarlyStoppingCallback
 )
-from datasets import Dataset
+from datasets import Dataset, Features, Value
 import evaluate
 
+# Files whose mtimes tell when a saved model was last written (weights, ONNX graphs, configs)
+_MODEL_FILE_SUFFIXES = (".safetensors", ".bin", ".onnx", ".json")
+
+
+def model_files_mtime(path):
+    """Newest mtime of the weight and config files in a saved model directory.
+    
+    save_pretrained overwrites the files of an existing directory without changing the
+    directory's own mtime, so that alone misses a model retrained into the same path.
+    Falls back to the directory's mtime when it holds none of those files.
+    """
+    with os.scandir(path) as entries:
+        mtimes = [entry.stat().st_mtime for entry in entries if entry.name.endswith(_MODEL_FILE_SUFFIXES) and entry.is_file()]
+    return max(mtimes, default=os.stat(path).st_mtime)
+
+
+def _compile_schema_re(pattern, flags=0):
+    """Compile a regex built from schema names, with re2 (linear time) when installed"""
+    if re2 is not None:
+        try:
+            return re2.compile("(?i)" + pattern if flags & re.IGNORECASE else pattern)
+        except re2.error:
+            pass  # syntax re2 does not support (e.g. lookaround); use re instead
+    return re.compile(pattern, flags)
+
+
+def _read_json(path):
+    """Read a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write data as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def _json_line(data):
+    """Serialize data as one newline-terminated line of JSON (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data).encode("utf-8") + b"\n"
+
+
+def _read_jsonl(path):
+    """Yield the records of a JSON Lines file, skipping lines that do not parse"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:  # e.g. a line cut short by a crash mid-write
+                continue
+
+
+# Where tokenized training splits are cached between training runs
+TOKENIZED_CACHE_DIR = os.path.join(".cache", "tokenized")
+# Part of the cache key; bump it whenever preprocess_data changes its output
+TOKENIZATION_VERSION = 1
+
+# Device shared by all instances, resolved once at import since probing CUDA is slow;
+# set TEXTTOSQL_FORCE_CPU to skip CUDA initialisation entirely
+if os.environ.get("TEXTTOSQL_FORCE_CPU"):
+    _DEVICE = torch.device("cpu")
+else:
+    _DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Dynamic INT8 quantization only pays off on CPUs with wide integer SIMD (AVX2 or
+# AVX512/VNNI) and a quantized backend; elsewhere it can be slower than FP32
+try:
+    _CPU_INT8_FAST = (
+        torch.backends.cpu.get_cpu_capability() in ("AVX2", "AVX512")
+        and bool({"x86", "fbgemm"} & set(torch.backends.quantized.supported_engines))
+    )
+except AttributeError:  # torch builds without CPU capability reporting
+    _CPU_INT8_FAST = False
+
+# Question for the throwaway generation that triggers compilation when a model is loaded;
+# a typical question, so the compiled graphs fit the shapes real queries produce
+_WARM_UP_QUESTION = "List all parts and their suppliers"
+
+# Handlers for the "TextToSQL" loggers, created once per process so that
+# multiple TextToSQLModel instances do not stack duplicate handlers
+_CONSOLE_HANDLER = logging.StreamHandler()
+_CONSOLE_HANDLER.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+_FILE_HANDLERS = {}  # absolute log file path -> buffered file handler
+_NULL_HANDLER = logging.NullHandler()  # for instances created with enable_logging=False
+
+# File writes happen on background threads: each log file's logger only puts records
+# on that file's queue, and the file's listener hands them to its buffered handler
+_LOG_LISTENERS = {}  # absolute log file path -> QueueListener writing that file
+
+
+def _stop_log_listeners():
+    """Write out the queued records and flush the buffered file handlers"""
+    for listener in _LOG_LISTENERS.values():
+        listener.stop()
+    for handler in _FILE_HANDLERS.values():
+        handler.flush()
+
+
+atexit.register(_stop_log_listeners)
+
+
+# Beam search settings for SQL generation. early_stopping=True ends the search as
+# soon as num_beams candidates have emitted EOS instead of decoding on in the hope
+# of a better-scoring longer one. (Sampling options such as temperature have no
+# effect on beam search without do_sample, so none are passed.)
+GENERATION_KWARGS = {
+    "num_beams": 5,
+    "early_stopping": True,
+    "length_penalty": 1.0,
+    "no_repeat_ngram_size": 0,
+    # Reuse the decoder's cached keys/values at each step (the encoder already runs
+    # once per generate call); stated explicitly so a model config cannot turn it off
+    "use_cache": True
+}
+
+# Column types of a question/sql training example
+EXAMPLE_FEATURES = Features({"question": Value("string"), "sql": Value("string")})
+
+# Instruction prompt, with schema information, that precedes each question in the
+# training inputs (see TextToSQLModel.preprocess_data)
+TRAINING_PROMPT_PREFIX = """
+        Tables:
+        - parts (part_number, description, price, weight, er_code, supplier_id, engineer_id, creation_date, modification_date, last_order_date, category, status)
+        - inventory (part_number, quantity, location, update_date, last_count_date)
+        - suppliers (id, supplier_name, contact, contract_date)
+        - engineers (id, name, department, hire_date)
+        """ + "\nConvert this question to SQL:"
+
+# Balanced sample data covering various SQL operations, used when load_data
+# is given neither a CSV file nor a data list. Kept out of the module so that
+# importing it does not build the sample dicts; read only when needed.
+DEFAULT_TRAINING_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_training_data.json")
+
+
+# Union of the trigger phrases used by TextToSQLModel._pattern_match_sql, one named
+# group per kind of pattern. Keep in sync with the patterns there: a pattern can only
+# match a question in which one scan found its trigger group.
+_PATTERN_TRIGGER_RE = re.compile(
+    r"(?P<after>after )|(?P<year>(?:created|made|from|in) \d{4})|(?P<with>with |has )"
+    r"|(?P<compare>less than|more than)|(?P<alphabetical>alphabetical)|(?P<count>count)"
+    r"|(?P<latest>latest|most recent|last|newest)|(?P<contains>containing|contains)"
+)
+
+# Month names and numbers, and "after <month>" in a lowercased question
+_MONTH_NUMBERS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12
+}
+_AFTER_MONTH_RE = re.compile(r'after (' + '|'.join(_MONTH_NUMBERS) + r')')
+
+# Fixed patterns used while matching questions and post-processing generated SQL
+_YEAR_RE = re.compile(r'(\d{4})')
+_CREATED_YEAR_RE = re.compile(r'(?:created|made|from|in) (\d{4})')
+_CATEGORY_RE = re.compile(r'(?:in|are in) the (\w+) (?:category|type|status)')
+_NOT_CATEGORY_RE = re.compile(r'not in the (\w+) (?:category|type|status)')
+_MORE_THAN_RE = re.compile(r'more than (\d+)')
+_LATEST_RE = re.compile(r'(?:latest|most recent|last|newest) (\w+) (?:date|time)')
+_FOR_ITEM_RE = re.compile(r'for (?:part|item) (\w+)')
+_SEARCH_TERM_RE = re.compile(r'(?:containing|contains|with|has) [\'"]?(\w+)[\'"]?')
+_FROM_TABLE_RE = re.compile(r'FROM (\w+)')
+_SELECT_PROJECTION_RE = re.compile(r'^SELECT\s+.*?\s+FROM\b', re.IGNORECASE | re.DOTALL)
+
+# Keyword sets for substring tests. A plain `in` per keyword beats a combined keyword
+# regex here: the questions are short and each branch tests only a few keywords.
+_NUMERIC_COLUMN_TERMS = ("price", "quantity", "amount", "count", "number", "id")
+_GROUPING_TERMS = ("each", "every", "per", "by")
+
+
+# (token, category) checks used by _classify_correction, in priority order. Plain
+# substring tests: cheaper than a regex for a literal token and same semantics.
+_CORRECTION_ERROR_PATTERNS = (
+    ("WHERE", "missing_where_clause"),
+    ("=", "missing_equality_operator"),
+    ("'", "missing_quotes"),
+)
+
+
+def _classify_correction(generated_sql, corrected_sql):
+    """Name the error a user correction fixed, or None if it fits no known category"""
+    for token, category in _CORRECTION_ERROR_PATTERNS:
+        if token in corrected_sql and token not in generated_sql:
+            return category
+    return None
+
+
+class QueryLogFormatter(logging.Formatter):
+    """File formatter that prefixes query records with their structured log entry"""
+    def format(self, record):
+        return getattr(record, "query_log_entry", "") + super().format(record)
+
+
+@dataclass(slots=True)
+class PerfMetrics:
+    """Per-session query counters (slotted: cheap attribute updates on every query)"""
+    total_queries: int = 0
+    pattern_matched: int = 0
+    model_generated: int = 0
+    user_corrected: int = 0
+    success_rate: float = 0.0
+
+
 class TextToSQLModel:
     def __init__(self, model_name="Salesforce/codet5p-220m", max_input_length=128, max_target_length=128, 
-                 log_file="sql_queries.log", feedback_file="sql_feedback.json", schema_file="schema.json"):
+                 log_file="sql_queries.log", feedback_file="sql_feedback.json", schema_file="schema.json",
+                 enable_logging=True, precision="auto"):
         self.model_name = model_name
         self.max_input_length = max_input_length
         self.max_target_length = max_target_length
-        self.tokenizer = None
-        self.model = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self._tokenizer = None  # loaded lazily, see the tokenizer/model properties
+        self._prefix_ids = None  # see _prompt_prefix_ids
+        self._input_prefix_ids = None  # see _input_prompt_prefix_ids
+        self._bleu = None  # sacrebleu metric, loaded by compute_metrics
+        self._model = None
+        self._model_source = None  # where an inference-only model was loaded from
+        self._model_on_device = False  # see generate_sql_batch
+        self._ort_model = None  # ONNX Runtime model used for generation instead, see load_onnx_runtime
+        self.loaded_model = None  # (path, mtime) of the last model loaded from disk
+        self._cached_dataset = None  # split of the built-in data, see load_data
+        self._original_examples = None  # see the original_examples property
+        self.device = _DEVICE
+        
+        # Inference precision: "auto" runs BF16 (or FP16) on CUDA and INT8-quantized Linear
+        # layers on capable CPUs, "fp32" always runs FP32
+        if precision not in ("auto", "fp32"):
+            raise ValueError(f"Unknown precision {precision!r}, expected 'auto' or 'fp32'")
+        self.precision = precision
+        self.amp_dtype = self._inference_dtype()
+        self.use_amp = self.amp_dtype != torch.float32
         
         # Set up logging
         self.log_file = log_file
+        self.enable_logging = enable_logging
         self._setup_logging()
         
-        # Set up feedback collection
+        # Set up feedback collection: metadata lives in feedback_file, while corrections
+        # and examples are appended to JSON Lines files next to it
         self.feedback_file = feedback_file
+        feedback_base = os.path.splitext(feedback_file)[0]
+        self._feedback_log_files = {
+            "corrections": f"{feedback_base}_corrections.jsonl",
+            "examples": f"{feedback_base}_examples.jsonl"
+        }
+        self._feedback_log_handles = {}  # opened on first append
         self.feedback_data = self._load_feedback_data()
         
-        # Track performance metrics
-        self.performance_metrics = {
-            "total_queries": 0,
-            "pattern_matched": 0,
-            "model_generated": 0,
-            "user_corrected": 0,
-            "success_rate": 0.0
+        # Corrected SQL by lowercased question; the latest correction for a question wins
+        self._corrections_by_q = {
+            correction["question"].lower(): correction["corrected_sql"]
+            for correction in self.feedback_data["corrections"]
         }
         
-        # Load schema configuration
+        # Track performance metrics
+        self.perf = PerfMetrics()
+        
+        # Load schema configuration (the schema setter precompiles its regexes)
         self.schema = self._load_schema(schema_file)
     
+    @property
+    def tokenizer(self):
+        """Tokenizer for model_name, loaded on first use"""
+        if self._tokenizer is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+        return self._tokenizer
+    
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+        self._prefix_ids = None  # tokenized with the previous tokenizer
+        self._input_prefix_ids = None
+    
+    @property
+    def model(self):
+        """Pretrained model for model_name, loaded on first use (half precision or INT8, see precision)"""
+        if self._model is None:
+            self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name, torch_dtype=self.amp_dtype)
+            self._model.to(self.device)
+            self._model_on_device = True
+            self._model = self._quantize_for_cpu(self._model)
+            self._compile_for_inference(self._model)
+            self._model_source = self.model_name
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._model_source = None
+        self._model_on_device = False
+        self._ort_model = None  # generate with the new model
+    
+    @property
+    def original_examples(self):
+        """Built-in question/sql pairs, one per question, read on first use"""
+        if self._original_examples is None:
+            examples = {}
+            for item in _read_json(DEFAULT_TRAINING_DATA_FILE):
+                examples.setdefault(item["question"].lower(), {"question": item["question"], "sql": item["sql"]})
+            self._original_examples = list(examples.values())
+        return self._original_examples
+    
+    def _inference_dtype(self):
+        """Weight dtype for inference-only loads: BF16 (or FP16) on CUDA, FP32 on CPU"""
+        if self.device.type != "cuda" or self.precision == "fp32":
+            return torch.float32
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    
+    def _quantize_for_cpu(self, model):
+        """Swap the Linear layers for dynamically quantized INT8 ones on capable CPUs"""
+        if self.device.type != "cpu" or self.precision == "fp32" or not _CPU_INT8_FAST:
+            return model
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    def _compile_for_inference(self, model):
+        """Compile the model's forward pass with torch.compile on CUDA"""
+        if self.device.type != "cuda":
+            # On CPU the compile time outweighs the gain for an interactive session
+            return model
+        
+        # Compile forward in place so generate() and save_pretrained() keep working on the
+        # plain module; decoding grows the sequence every step, hence dynamic shapes
+        model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=False, dynamic=True)
+        return model
+    
     def _setup_logging(self):
         """Set up logging configuration"""
-        # Create a logger
-        self.logger = logging.getLogger("TextToSQL")
+        if not self.enable_logging:
+            # Separate silent logger, so instances that do log are unaffected
+            self.logger = logging.getLogger("TextToSQL.disabled")
+            self.logger.propagate = False
+            self.logger.setLevel(logging.CRITICAL + 1)
+            self.logger.addHandler(_NULL_HANDLER)
+            
+            # Shadow log_query with a no-op so generate_sql skips building log entries
+            self.log_query = lambda *args, **kwargs: None
+            return
+        
+        # One logger per log file, shared by the instances writing that file; it must
+        # not propagate, or records would also reach the loggers of other log files
+        log_key = os.path.abspath(self.log_file)
+        self.logger = logging.getLogger(f"TextToSQL.{log_key}")
         self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
         
-        # Create handlers
-        file_handler = logging.FileHandler(self.log_file)
-        console_handler = logging.StreamHandler()
-        
-        # Create formatters
-        file_formatter = logging.Formatter('%(asctime)s | %(levelname)s | Question: %(message)s')
-        console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+        # Handlers are module-level singletons; addHandler ignores ones already attached.
+        # Console output stays synchronous so it appears in order with the console's prompts
+        self.logger.addHandler(_CONSOLE_HANDLER)
         
-        # Set formatters
-        file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # File writes go through a queue and listener of their own per log file
+        if log_key not in _FILE_HANDLERS:
+            file_handler = logging.FileHandler(self.log_file, encoding="utf-8", delay=True)
+            file_handler.setFormatter(QueryLogFormatter('%(asctime)s | %(levelname)s | Question: %(message)s'))
+            
+            # Buffer file writes and flush them in batches (immediately on warnings)
+            memory_handler = logging.handlers.MemoryHandler(capacity=256, flushLevel=logging.WARNING, target=file_handler)
+            
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, memory_handler)
+            listener.start()
+            
+            _FILE_HANDLERS[log_key] = memory_handler
+            _LOG_LISTENERS[log_key] = listener
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         # Log initialization
         self.logger.info(f"TextToSQL model initialized with {self.model_name}")
     
     def log_query(self, question, sql_query, success=True, method="model"):
         """Log a question and its generated SQL query"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create a formatted log entry
-        log_entry = f"\n--- Query Log Entry: {timestamp} ---\n"
-        log_entry += f"Question: {question}\n"
-        log_entry += f"SQL: {sql_query}\n"
-        log_entry += f"Status: {'Success' if success else 'Failure'}\n"
-        log_entry += f"Method: {method}\n"
-        log_entry += "-" * 50
-        
-        # Append to log file
-        with open(self.log_file, "a", encoding='utf-8') as f:
-            f.write(log_entry)
+        # Format the timestamp by hand; strftime goes through locale-aware formatting
+        now = time.localtime()
+        timestamp = f"{now.tm_year:04d}-{now.tm_mon:02d}-{now.tm_mday:02d} {now.tm_hour:02d}:{now.tm_min:02d}:{now.tm_sec:02d}"
+        
+        # Create a formatted log entry in a single string build
+        log_entry = (
+            f"\n--- Query Log Entry: {timestamp} ---\n"
+            f"Question: {question}\n"
+            f"SQL: {sql_query}\n"
+            f"Status: {'Success' if success else 'Failure'}\n"
+            f"Method: {method}\n"
+            f"{'-' * 50}"
+        )
         
-        # Also log to the logger
+        # Log through the logger; the file formatter writes the entry ahead of the log line
         level = logging.INFO if success else logging.WARNING
-        self.logger.log(level, f"{question} -> {sql_query}")
+        self.logger.log(level, f"{question} -> {sql_query}", extra={"query_log_entry": log_entry})
         
         return log_entry
     
@@ -100,606 +441,146 @@ class TextToSQLModel:
         Load data either from a CSV file or a list of dictionaries.
         Each item should have 'question' and 'sql' keys.
         """
+        # The built-in data is split once and reused until the feedback data changes
+        use_default_data = not (data_path and os.path.exists(data_path)) and not data_list
+        if use_default_data and self._cached_dataset is not None:
+            return self._cached_dataset
+        
         if data_path and os.path.exists(data_path):
-            # Load from CSV file
-            df = pd.read_csv(data_path)
-            data = df.to_dict('records')
+            # Load from CSV file; rows are read straight into question/sql dicts
+            with open(data_path, newline='', encoding='utf-8') as f:
+                data = list(csv.DictReader(f))
         elif data_list:
             # Use provided list
             data = data_list
         else:
-            # Balanced sample data covering various SQL operations
-            data = [
-                {"question": "Show me all items", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS"},
-                {"question": "List all part numbers", "sql": "SELECT PART_NUMBER FROM vMTL_SYSTEM_ITEMS"},
-                {"question": "Get all descriptions of items", "sql": "SELECT DESCRIPTION FROM vMTL_SYSTEM_ITEMS"},
-                {"question": "Show items that are not orderable", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE ORDERABLE_ON_WEB_FLAG = 'N'"},
-                {"question": "List all items with a price greater than 100", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE LIST_PRICE_PER_UNIT > 100"},
-                {"question": "Get items with a warranty", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE WARRANTY_VENDOR_ID IS NOT NULL"},
-                {"question": "Get all items in a specific organization", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE ORGANIZATION_ID = 1"},
-                {"question": "List all items with a certain inventory status", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE INVENTORY_ITEM_STATUS_CODE = 'ACTIVE'"},
-                {"question": "Show all items from a specific supplier", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE SUPPLIER = 'SupplierA'"},
-                {"question": "Get the planning make-buy code for each item", "sql": "SELECT PART_NUMBER, PLANNING_MAKE_BUY_CODE_NAME FROM vMTL_SYSTEM_ITEMS"},
-                {"question": "Find all items with a minimum order quantity of 5", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE MINIMUM_ORDER_QUANTITY >= 5"},
-                {"question": "Show the list of items with a cost of sales account", "sql": "SELECT PART_NUMBER, COST_OF_SALES_ACCOUNT FROM vMTL_SYSTEM_ITEMS"},
-                {"question": "List all items eligible for internal order", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE INTERNAL_ORDER_ENABLED_FLAG = 'Y'"},
-                {"question": "Find all items with fixed lead time", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE FIXED_LEAD_TIME IS NOT NULL"},
-                {"question": "Get all items in a specific location", "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE LOCATION_CONTROL_CODE = 'LOC1'"},
-                
-                {"question": "Show me all items along with their supplier names", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, suppliers.SUPPLIER_NAME FROM vMTL_SYSTEM_ITEMS JOIN suppliers ON vMTL_SYSTEM_ITEMS.SUPPLIER = suppliers.SUPPLIER_ID"},
-                
-                {"question": "List all items with their current stock levels and their corresponding warehouse locations", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, inventory_levels.STOCK_LEVEL, warehouse.LOCATION_NAME FROM vMTL_SYSTEM_ITEMS JOIN inventory_levels ON vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID = inventory_levels.INVENTORY_ITEM_ID JOIN warehouse ON inventory_levels.WAREHOUSE_ID = warehouse.WAREHOUSE_ID"},
-                
-                {"question": "Get all items that have a warranty and are from a specific supplier", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, WARRANTY_VENDOR_ID FROM vMTL_SYSTEM_ITEMS WHERE WARRANTY_VENDOR_ID IS NOT NULL AND SUPPLIER = 'SupplierA'"},
-                
-                {"question": "List all items that have been recently updated and their corresponding inventory status", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, LAST_UPDATE_DATE, INVENTORY_ITEM_STATUS_CODE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE > '2025-01-01'"},
-                
-                {"question": "Find items with the highest price from each inventory organization", 
-                "sql": "SELECT ORGANIZATION_ID, PART_NUMBER, DESCRIPTION, MAX(LIST_PRICE_PER_UNIT) AS MAX_PRICE FROM vMTL_SYSTEM_ITEMS GROUP BY ORGANIZATION_ID"},
-                
-                {"question": "Get the items with the highest inventory levels by warehouse location", 
-                "sql": "SELECT warehouse.LOCATION_NAME, vMTL_SYSTEM_ITEMS.PART_NUMBER, inventory_levels.STOCK_LEVEL FROM inventory_levels JOIN vMTL_SYSTEM_ITEMS ON inventory_levels.INVENTORY_ITEM_ID = vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID JOIN warehouse ON inventory_levels.WAREHOUSE_ID = warehouse.WAREHOUSE_ID WHERE inventory_levels.STOCK_LEVEL = (SELECT MAX(STOCK_LEVEL) FROM inventory_levels WHERE WAREHOUSE_ID = warehouse.WAREHOUSE_ID)"},
-                
-                {"question": "List all items that are marked as orderable on the web along with their supplier and inventory status", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, SUPPLIER, INVENTORY_ITEM_STATUS_CODE FROM vMTL_SYSTEM_ITEMS WHERE ORDERABLE_ON_WEB_FLAG = 'Y'"},
-                
-                {"question": "Show all items with their cost and sales accounts", 
-                "sql": "SELECT PART_NUMBER, COST_OF_SALES_ACCOUNT, SALES_ACCOUNT FROM vMTL_SYSTEM_ITEMS JOIN sales_accounts ON vMTL_SYSTEM_ITEMS.SALES_ACCOUNT_ID = sales_accounts.SALES_ACCOUNT_ID"},
-                
-                {"question": "List all items with a planning time fence greater than 30 days", 
-                "sql": "SELECT PART_NUMBER, PLANNING_TIME_FENCE_DAYS, DESCRIPTION FROM vMTL_SYSTEM_ITEMS WHERE PLANNING_TIME_FENCE_DAYS > 30"},
-                
-                {"question": "Show the total number of items ordered by each buyer along with their total cost", 
-                "sql": "SELECT BUYER_NAME, COUNT(PART_NUMBER) AS ITEM_COUNT, SUM(LIST_PRICE_PER_UNIT) AS TOTAL_COST FROM vMTL_SYSTEM_ITEMS GROUP BY BUYER_NAME"},
-                
-                {"question": "Get items with their corresponding tax code and description", 
-                "sql": "SELECT PART_NUMBER, TAX_CODE, DESCRIPTION FROM vMTL_SYSTEM_ITEMS JOIN tax_codes ON vMTL_SYSTEM_ITEMS.TAX_CODE = tax_codes.TAX_CODE_ID"},
-                
-                {"question": "Find all items with a quantity on hand less than 10 and from a specific catalog", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, inventory_levels.STOCK_LEVEL FROM vMTL_SYSTEM_ITEMS JOIN inventory_levels ON vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID = inventory_levels.INVENTORY_ITEM_ID JOIN item_catalog ON vMTL_SYSTEM_ITEMS.ITEM_CATALOG_GROUP_ID = item_catalog.CATALOG_GROUP_ID WHERE inventory_levels.STOCK_LEVEL < 10 AND item_catalog.CATALOG_NAME = 'CatalogA'"},
-                
-                {"question": "Show all items with their respective minimum and maximum order quantities", 
-                "sql": "SELECT PART_NUMBER, MINIMUM_ORDER_QUANTITY, MAXIMUM_ORDER_QUANTITY FROM vMTL_SYSTEM_ITEMS"},
-                
-                {"question": "Get all items where the cost of sales account matches the expense account", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, COST_OF_SALES_ACCOUNT, EXPENSE_ACCOUNT FROM vMTL_SYSTEM_ITEMS WHERE COST_OF_SALES_ACCOUNT = EXPENSE_ACCOUNT"},
-                
-                {"question": "List all items that have a predefined serial number and are active", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, SERIAL_NUMBER_CONTROL_CODE FROM vMTL_SYSTEM_ITEMS WHERE SERIAL_NUMBER_CONTROL_CODE IS NOT NULL AND INVENTORY_ITEM_STATUS_CODE = 'ACTIVE'"},
-                
-                {"question": "Show items that are marked for preventive maintenance", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION FROM vMTL_SYSTEM_ITEMS WHERE PREVENTIVE_MAINTENANCE_FLAG = 'Y'"},
-                
-                {"question": "Get all items with their environmental compliance status", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, ENVIRONMENTAL_COMPLIANCE_STATUS FROM vMTL_SYSTEM_ITEMS"},
-                
-                {"question": "List all items with their pricing and vendor warranty details", 
-                "sql": "SELECT PART_NUMBER, LIST_PRICE_PER_UNIT, WARRANTY_VENDOR_ID, WARRANTY_VENDOR_NAME FROM vMTL_SYSTEM_ITEMS JOIN warranty_vendors ON vMTL_SYSTEM_ITEMS.WARRANTY_VENDOR_ID = warranty_vendors.VENDOR_ID"},
-                
-                {"question": "Get all items, their descriptions, and their corresponding lead times from the inventory", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, vMTL_SYSTEM_ITEMS.FULL_LEAD_TIME FROM vMTL_SYSTEM_ITEMS"},
-                
-                {"question": "Show all items, their associated tax codes, and their corresponding sales account", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, vMTL_SYSTEM_ITEMS.TAX_CODE, vMTL_SYSTEM_ITEMS.SALES_ACCOUNT FROM vMTL_SYSTEM_ITEMS"},
-                
-                {"question": "List all items and their total order quantities per organization", 
-                "sql": "SELECT ORGANIZATION_ID, PART_NUMBER, SUM(ORDER_QUANTITY) AS TOTAL_ORDER_QUANTITY FROM vMTL_SYSTEM_ITEMS JOIN orders ON vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID = orders.INVENTORY_ITEM_ID GROUP BY ORGANIZATION_ID, PART_NUMBER"},
-                
-                {"question": "Show all items with their current inventory status and orderable status", 
-                "sql": "SELECT PART_NUMBER, INVENTORY_ITEM_STATUS_CODE, ORDERABLE_ON_WEB_FLAG FROM vMTL_SYSTEM_ITEMS WHERE ORDERABLE_ON_WEB_FLAG = 'Y'"},
-                
-                {"question": "Get the items with the highest and lowest prices, along with their descriptions", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, LIST_PRICE_PER_UNIT FROM vMTL_SYSTEM_ITEMS WHERE LIST_PRICE_PER_UNIT = (SELECT MAX(LIST_PRICE_PER_UNIT) FROM vMTL_SYSTEM_ITEMS) OR LIST_PRICE_PER_UNIT = (SELECT MIN(LIST_PRICE_PER_UNIT) FROM vMTL_SYSTEM_ITEMS)"},
-                
-                {"question": "Find all items from a specific buyer with their current inventory levels and supplier names", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, inventory_levels.STOCK_LEVEL, suppliers.SUPPLIER_NAME FROM vMTL_SYSTEM_ITEMS JOIN inventory_levels ON vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID = inventory_levels.INVENTORY_ITEM_ID JOIN suppliers ON vMTL_SYSTEM_ITEMS.SUPPLIER = suppliers.SUPPLIER_ID WHERE vMTL_SYSTEM_ITEMS.BUYER_NAME = 'John Doe'"},
-                
-                {"question": "Get all items from a certain organization that are currently backordered", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, BACK_ORDERABLE_FLAG FROM vMTL_SYSTEM_ITEMS WHERE ORGANIZATION_ID = 'OrgA' AND BACK_ORDERABLE_FLAG = 'Y'"},
-                
-                {"question": "Show all items with their associated fixed order quantity and maximum order quantity", 
-                "sql": "SELECT PART_NUMBER, FIXED_ORDER_QUANTITY, MAXIMUM_ORDER_QUANTITY FROM vMTL_SYSTEM_ITEMS WHERE FIXED_ORDER_QUANTITY IS NOT NULL AND MAXIMUM_ORDER_QUANTITY IS NOT NULL"},
-                
-                {"question": "Get the list of items that are marked for environmental compliance and their safety stock bucket days", 
-                "sql": "SELECT PART_NUMBER, ENVIRONMENTAL_COMPLIANCE_STATUS, SAFETY_STOCK_BUCKET_DAYS FROM vMTL_SYSTEM_ITEMS WHERE ENVIRONMENTAL_COMPLIANCE_STATUS = 'Compliant'"},
-                
-                {"question": "Find all items and their corresponding inventory planning codes and descriptions", 
-                "sql": "SELECT PART_NUMBER, INVENTORY_PLANNING_CODE, INVENTORY_PLANNING_CODE_NAME FROM vMTL_SYSTEM_ITEMS"},
-                
-                {"question": "Show the total count of items ordered by each vendor along with the total cost of orders", 
-                "sql": "SELECT suppliers.SUPPLIER_NAME, COUNT(vMTL_SYSTEM_ITEMS.PART_NUMBER) AS ITEM_COUNT, SUM(vMTL_SYSTEM_ITEMS.LIST_PRICE_PER_UNIT) AS TOTAL_COST FROM vMTL_SYSTEM_ITEMS JOIN suppliers ON vMTL_SYSTEM_ITEMS.SUPPLIER = suppliers.SUPPLIER_ID GROUP BY suppliers.SUPPLIER_NAME"},
-                
-                {"question": "Get all items where the order quantity exceeds a specific threshold and show their planning time fence", 
-                "sql": "SELECT PART_NUMBER, ORDER_QUANTITY, PLANNING_TIME_FENCE_DAYS FROM vMTL_SYSTEM_ITEMS WHERE ORDER_QUANTITY > 100 AND PLANNING_TIME_FENCE_DAYS > 30"},
-                
-                {"question": "Find items that have been ordered with a price higher than their defined maximum price", 
-                "sql": "SELECT PART_NUMBER, ORDER_QUANTITY, LIST_PRICE_PER_UNIT FROM vMTL_SYSTEM_ITEMS WHERE ORDER_QUANTITY > 0 AND LIST_PRICE_PER_UNIT > MAXIMUM_ORDER_QUANTITY"},
-                
-                {"question": "Get all items from a particular catalog and show their buyer's name, price, and planning make-buy code", 
-                "sql": "SELECT vMTL_SYSTEM_ITEMS.PART_NUMBER, vMTL_SYSTEM_ITEMS.DESCRIPTION, vMTL_SYSTEM_ITEMS.BUYER_NAME, vMTL_SYSTEM_ITEMS.LIST_PRICE_PER_UNIT, vMTL_SYSTEM_ITEMS.PLANNING_MAKE_BUY_CODE_NAME FROM vMTL_SYSTEM_ITEMS JOIN item_catalog ON vMTL_SYSTEM_ITEMS.ITEM_CATALOG_GROUP_ID = item_catalog.CATALOG_GROUP_ID WHERE item_catalog.CATALOG_NAME = 'CatalogA'"},
-                
-                {"question": "List all items that have a warranty expiration date and their warranty vendor details", 
-                "sql": "SELECT PART_NUMBER, WARRANTY_VENDOR_ID, WARRANTY_EXPIRATION_DATE FROM vMTL_SYSTEM_ITEMS JOIN warranty_vendors ON vMTL_SYSTEM_ITEMS.WARRANTY_VENDOR_ID = warranty_vendors.VENDOR_ID WHERE WARRANTY_EXPIRATION_DATE > '2025-01-01'"},
-                
-                {"question": "Get all items with their planning time fence, orderable flag, and backorderable flag", 
-                "sql": "SELECT PART_NUMBER, PLANNING_TIME_FENCE_DAYS, ORDERABLE_ON_WEB_FLAG, BACK_ORDERABLE_FLAG FROM vMTL_SYSTEM_ITEMS WHERE ORDERABLE_ON_WEB_FLAG = 'Y' AND BACK_ORDERABLE_FLAG = 'Y'"},
-                
-                {"question": "Show the most expensive item from each organization and its supplier", 
-                "sql": "SELECT ORGANIZATION_ID, PART_NUMBER, SUPPLIER, MAX(LIST_PRICE_PER_UNIT) AS MAX_PRICE FROM vMTL_SYSTEM_ITEMS GROUP BY ORGANIZATION_ID, SUPPLIER"},
-                
-                {"question": "Get the items that are flagged for inspection, along with their hazard class description", 
-                "sql": "SELECT PART_NUMBER, DESCRIPTION, HAZARD_CLASS_DESC FROM vMTL_SYSTEM_ITEMS WHERE INSPECTION_REQUIRED_FLAG = 'Y'"},
-                
-                {"question": "List all items, their corresponding cost of sales account, and the total quantity ordered", 
-                "sql": "SELECT PART_NUMBER, COST_OF_SALES_ACCOUNT, SUM(ORDER_QUANTITY) AS TOTAL_ORDERED FROM vMTL_SYSTEM_ITEMS JOIN orders ON vMTL_SYSTEM_ITEMS.INVENTORY_ITEM_ID = orders.INVENTORY_ITEM_ID GROUP BY PART_NUMBER, COST_OF_SALES_ACCOUNT"},
-                
-            
-                {
-                    "question": "Which parts were updated in the last 6 months?",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE >= ADD_MONTHS(SYSDATE, -6)"
-                },
-                {
-                    "question": "Get all items along with how many days since they were last updated",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE, TRUNC(SYSDATE - LAST_UPDATE_DATE) AS DAYS_SINCE_LAST_UPDATE FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Show parts that were created more than 5 years ago",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE < ADD_MONTHS(SYSDATE, -60)"
-                },
-                {
-                    "question": "Get the number of parts created each year",
-                    "sql": "SELECT EXTRACT(YEAR FROM CREATION_DATE) AS YEAR, COUNT(*) AS TOTAL_PARTS FROM vMTL_SYSTEM_ITEMS GROUP BY EXTRACT(YEAR FROM CREATION_DATE) ORDER BY YEAR"
-                },
-                {
-                    "question": "Find all parts that were created in the same month as today",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE EXTRACT(MONTH FROM CREATION_DATE) = EXTRACT(MONTH FROM SYSDATE)"
-                },
-                {
-                    "question": "List all suppliers and the most recent part they supplied",
-                    "sql": "SELECT SUPPLIER, MAX(CREATION_DATE) AS MOST_RECENT_PART_DATE FROM vMTL_SYSTEM_ITEMS GROUP BY SUPPLIER"
-                },
-                
-                {
-                    "question": "Show all parts created in the last 30 days",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= TRUNC(SYSDATE - 30)"
-                },
-                {
-                    "question": "Show all parts created in 2024",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "List part numbers added in 2023",
-                    "sql": "SELECT PART_NUMBER FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2023-01-01' AND CREATION_DATE <= '2023-12-31'"
-                },
-                {
-                    "question": "Get items last updated in 2022",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE >= '2022-01-01' AND LAST_UPDATE_DATE <= '2022-12-31'"
-                },
-                {
-                    "question": "Find all items created in December 2024",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-12-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "Which parts were updated in Q1 2023?",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE >= '2023-01-01' AND LAST_UPDATE_DATE <= '2023-03-31'"
-                },
-                {
-                    "question": "Get all parts ordered in 2021",
-                    "sql": "SELECT PART_NUMBER, ATTRIBUTE11 FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2021-01-01' AND CREATION_DATE <= '2021-12-31'"
-                },
-                {
-                    "question": "List parts modified in 2020",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE >= '2020-01-01' AND LAST_UPDATE_DATE <= '2020-12-31'"
-                },
-                {
-                    "question": "Show everything created in the year 2019",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2019-01-01' AND CREATION_DATE <= '2019-12-31'"
-                },
-                {
-                    "question": "How many parts were added in 2024?",
-                    "sql": "SELECT COUNT(*) AS TOTAL_PARTS_2024 FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "Get all parts added in the same year as part 12345",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE EXTRACT(YEAR FROM CREATION_DATE) = (SELECT EXTRACT(YEAR FROM CREATION_DATE) FROM vMTL_SYSTEM_ITEMS WHERE PART_NUMBER = '12345')"
-                },
-                {
-                    "question": "Give me all part numbers created by ER code XYZ789",
-                    "sql": "SELECT PART_NUMBER FROM vMTL_SYSTEM_ITEMS WHERE ORGANIZATION_CODE = 'XYZ789'"
-                },
-                {
-                    "question": "Hey, can you show me a list of all the parts we have?",
-                    "sql": "SELECT ORGANIZATION_ID, ORGANIZATION_CODE, INVENTORY_ITEM_ID, PART_NUMBER, DESCRIPTION, ITEM_TYPE, ITEM_TYPE_NAME, INVENTORY_ITEM_STATUS_CODE, PLANNER_CODE, PLANNER_NAME, BUYER_NAME, PLANNING_MAKE_BUY_CODE_NAME FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "I need to see just the part numbers, nothing else.",
-                    "sql": "SELECT PART_NUMBER FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "I'm looking for any parts that have XYZ789 as their ER code.",
-                    "sql": "SELECT PART_NUMBER, ORGANIZATION_ID, INVENTORY_ITEM_ID, DESCRIPTION FROM vMTL_SYSTEM_ITEMS WHERE ORGANIZATION_CODE = 'XYZ789'"
-                },
-                {
-                    "question": "Get all items with their planning time fence, orderable flag, and backorderable flag",
-                    "sql": "SELECT PART_NUMBER, PLANNING_TIME_FENCE_CODE, ORDERABLE_ON_WEB_FLAG, BACK_ORDERABLE_FLAG FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Get all items where the cost of sales account matches the expense account",
-                    "sql": "SELECT PART_NUMBER, COST_OF_SALES_ACCOUNT, EXPENSE_ACCOUNT FROM vMTL_SYSTEM_ITEMS WHERE COST_OF_SALES_ACCOUNT = EXPENSE_ACCOUNT"
-                },
-                {
-                    "question": "List all items that have been recently updated and their corresponding inventory status",
-                    "sql": "SELECT PART_NUMBER, INVENTORY_ITEM_STATUS_CODE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS ORDER BY LAST_UPDATE_DATE DESC"
-                },
-                {
-                    "question": "Get items with their corresponding tax code and description",
-                    "sql": "SELECT PART_NUMBER, TAX_CODE, DESCRIPTION FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Get all items from a certain organization that are currently backordered",
-                    "sql": "SELECT PART_NUMBER, ORGANIZATION_ID, BACK_ORDERABLE_FLAG FROM vMTL_SYSTEM_ITEMS WHERE BACK_ORDERABLE_FLAG = 'Y'"
-                },
-                {
-                    "question": "Get the items with the highest and lowest prices, along with their descriptions",
-                    "sql": "SELECT PART_NUMBER, DESCRIPTION, ACTUAL_PRICE FROM vMTL_SYSTEM_ITEMS WHERE ACTUAL_PRICE = (SELECT MAX(ACTUAL_PRICE) FROM vMTL_SYSTEM_ITEMS) OR ACTUAL_PRICE = (SELECT MIN(ACTUAL_PRICE) FROM vMTL_SYSTEM_ITEMS)"
-                },
-                {
-                    "question": "Which items have not been updated since 2018?",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE < TO_DATE('2019-01-01', 'YYYY-MM-DD')"
-                },
-                {
-                    "question": "Get the items that are flagged for inspection, along with their hazard class description",
-                    "sql": "SELECT PART_NUMBER, INSPECTION_REQUIRED_FLAG, HAZARD_CLASS_DESCRIPTION FROM vMTL_SYSTEM_ITEMS WHERE INSPECTION_REQUIRED_FLAG = 'Y'"
-                },
-                {
-                    "question": "Get all items, their descriptions, and their corresponding lead times from the inventory",
-                    "sql": "SELECT PART_NUMBER, DESCRIPTION, CUM_MANUFACTURING_LEAD_TIME FROM vMTL_SYSTEM_ITEMS"
-                },
-                 {
-                    "question": "Get all items created after January 1, 2020",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE > '2020-01-01'"
-                },
-                {
-                    "question": "List all items added in the year 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE EXTRACT(YEAR FROM CREATION_DATE) = 2021"
-                },
-                {
-                    "question": "Show me all items created before March 15, 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE < '2022-03-15'"
-                },
-                {
-                    "question": "Find all items created between January 1, 2021 and December 31, 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE BETWEEN '2021-01-01' AND '2021-12-31'"
-                },
-                {
-                    "question": "Get all items that were created in February 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE EXTRACT(MONTH FROM CREATION_DATE) = 2 AND EXTRACT(YEAR FROM CREATION_DATE) = 2022"
-                },
-                {
-                    "question": "List all items created on or after February 1, 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2021-02-01'"
-                },
-                {
-                    "question": "Show all items created in the last 30 days",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= CURRENT_DATE - INTERVAL '30 days'"
-                },
-                {
-                    "question": "Get all items created in the first quarter of 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2022-01-01' AND CREATION_DATE < '2022-04-01'"
-                },
-                {
-                    "question": "Find all items created on February 29, 2020",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE = '2020-02-29'"
-                },
-                {
-                    "question": "List all items created in the summer of 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2021-06-01' AND CREATION_DATE < '2021-09-01'"
-                },
-                {
-                    "question": "Get all items created in the last year",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= CURRENT_DATE - INTERVAL '1 year'"
-                },
-                {
-                    "question": "Show me items created on the last day of 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE = '2021-12-31'"
-                },
-                {
-                    "question": "Find all items created in the month of January 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE EXTRACT(MONTH FROM CREATION_DATE) = 1 AND EXTRACT(YEAR FROM CREATION_DATE) = 2022"
-                },
-                {
-                    "question": "Get all items created after the last quarter of 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE > '2021-12-31'"
-                },
-                {
-                    "question":"​Please help to pull all the PTO model for ER R1 for all statuses. Thanks.",
-                    "sql": "select ER_code,PART_NUMBER, ITEM_TYPE_NAME,INVENTORY_ITEM_STATUS_CODE from vMTL_SYSTEM_ITEMS where ER_CODE='R1' and ITEM_TYPE_NAME = 'PTO Model'"
-                },
-                {
-                    "question": "Find all items where the make or buy code is set to Make",
-                    "sql": "SELECT PART_NUMBER, PLANNING_MAKE_BUY_CODE_NAME FROM vMTL_SYSTEM_ITEMS WHERE PLANNING_MAKE_BUY_CODE_NAME = 'Make'"
-                },
-                {
-                    "question": "Show me all items that have no supplier listed",
-                    "sql": "SELECT PART_NUMBER, SUPPLIER FROM vMTL_SYSTEM_ITEMS WHERE SUPPLIER IS NULL"
-                },
-                {
-                    "question": "Which items have a description that contains the word 'bolt'?",
-                    "sql": "SELECT PART_NUMBER, DESCRIPTION FROM vMTL_SYSTEM_ITEMS WHERE LOWER(DESCRIPTION) LIKE '%bolt%'"
-                },
-                {
-                    "question": "List the top 10 most recently created items",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS ORDER BY CREATION_DATE DESC FETCH FIRST 10 ROWS ONLY"
-                },
-                {
-                    "question": "Get all items where the category is Mechanical",
-                    "sql": "SELECT PART_NUMBER, MAIN_CATEGORY FROM vMTL_SYSTEM_ITEMS WHERE MAIN_CATEGORY = 'Mechanical'"
-                },
-                {
-                    "question": "Find items with a lead time greater than 30 days",
-                    "sql": "SELECT PART_NUMBER, CUM_MANUFACTURING_LEAD_TIME FROM vMTL_SYSTEM_ITEMS WHERE CUM_MANUFACTURING_LEAD_TIME > 30"
-                },
-                {
-                    "question": "Show me all active items from organization 202",
-                    "sql": "SELECT PART_NUMBER, ORGANIZATION_ID, INVENTORY_ITEM_STATUS_CODE FROM vMTL_SYSTEM_ITEMS WHERE ORGANIZATION_ID = 202 AND INVENTORY_ITEM_STATUS_CODE = 'Active'"
-                },
-                {
-                    "question": "Find all items that are returnable and trackable",
-                    "sql": "SELECT PART_NUMBER, RETURNABLE_FLAG, TRACKING_QUANTITY_IND FROM vMTL_SYSTEM_ITEMS WHERE RETURNABLE_FLAG = 'Y' AND TRACKING_QUANTITY_IND = 'Y'"
-                },
-                {
-                    "question": "List all unique suppliers",
-                    "sql": "SELECT DISTINCT SUPPLIER FROM vMTL_SYSTEM_ITEMS WHERE SUPPLIER IS NOT NULL"
-                },
-            
-                {
-                    "question": "Find items where the inventory item type is 'Finished Good'",
-                    "sql": "SELECT PART_NUMBER, ITEM_TYPE_NAME FROM vMTL_SYSTEM_ITEMS WHERE ITEM_TYPE_NAME = 'Finished Good'"
-                },
-                {
-                    "question": "Show items where the serial generation flag is not enabled",
-                    "sql": "SELECT PART_NUMBER, SERIAL_NUMBER_GENERATION_FLAG FROM vMTL_SYSTEM_ITEMS WHERE SERIAL_NUMBER_GENERATION_FLAG = 'N'"
-                },
-                {
-                    "question": "List the items with a planner name starting with 'Ali'",
-                    "sql": "SELECT PART_NUMBER, PLANNER_NAME FROM vMTL_SYSTEM_ITEMS WHERE PLANNER_NAME LIKE 'Ali%'"
-                },
-                {
-                    "question": "Show me parts created before 2020 but updated after 2023",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE < TO_DATE('2020-01-01', 'YYYY-MM-DD') AND LAST_UPDATE_DATE > TO_DATE('2023-01-01', 'YYYY-MM-DD')"
-                },
-                {
-                    "question": "Give me a count of all parts per organization",
-                    "sql": "SELECT ORGANIZATION_ID, COUNT(*) AS PART_COUNT FROM vMTL_SYSTEM_ITEMS GROUP BY ORGANIZATION_ID"
-                },
-                {
-                    "question": "Get all items with both tax code and list price available",
-                    "sql": "SELECT PART_NUMBER, TAX_CODE, LIST_PRICE FROM vMTL_SYSTEM_ITEMS WHERE TAX_CODE IS NOT NULL AND LIST_PRICE IS NOT NULL"
-                },
-                {
-                    "question": "Find items where the warranty classification is 'Premium'",
-                    "sql": "SELECT PART_NUMBER, WARRANTY_CLASSIFICATION FROM vMTL_SYSTEM_ITEMS WHERE WARRANTY_CLASSIFICATION = 'Premium'"
-                },
-                {
-                    "question": "List all parts that are customer order enabled but not internal order enabled",
-                    "sql": "SELECT PART_NUMBER, CUSTOMER_ORDER_ENABLED_FLAG, INTERNAL_ORDER_ENABLED_FLAG FROM vMTL_SYSTEM_ITEMS WHERE CUSTOMER_ORDER_ENABLED_FLAG = 'Y' AND INTERNAL_ORDER_ENABLED_FLAG = 'N'"
-                },
-                {
-                    "question": "Find all items that have been deleted or disabled",
-                    "sql": "SELECT PART_NUMBER, INVENTORY_ITEM_STATUS_CODE FROM vMTL_SYSTEM_ITEMS WHERE INVENTORY_ITEM_STATUS_CODE IN ('Disabled', 'Deleted')"
-                },
-                {
-                    "question": "Show me all distinct item types and their names",
-                    "sql": "SELECT DISTINCT ITEM_TYPE, ITEM_TYPE_NAME FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Get all items created on or after January 1st, 2024",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01'"
-                },
-                {
-                    "question": "Find items that were updated before June 15, 2023",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE < '2023-06-15'"
-                },
-                {
-                    "question": "Show parts created between February 1st, 2024 and March 1st, 2024",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-02-01' AND CREATION_DATE <= '2024-03-01'"
-                },
-                {
-                    "question": "List all items updated after December 31, 2023",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE > '2023-12-31'"
-                },
-                {
-                    "question": "Which items were created before 2022?",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE < '2022-01-01'"
-                },
-                {
-                    "question": "Find items that were both created and last updated in 2024",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31' AND LAST_UPDATE_DATE >= '2024-01-01' AND LAST_UPDATE_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "Get parts created exactly on March 15, 2024",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE = '2024-03-15'"
-                },
-                {
-                    "question": "Show me parts that were created after January 1, 2023 and not updated after January 1, 2024",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE > '2023-01-01' AND LAST_UPDATE_DATE <= '2024-01-01'"
-                },
-                {
-                    "question": "List all items that were created and updated on the same day",
-                    "sql": "SELECT PART_NUMBER, CREATION_DATE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE = LAST_UPDATE_DATE"
-                },
-                {
-                    "question": "Find items that have not been updated since 2022",
-                    "sql": "SELECT PART_NUMBER, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE < '2023-01-01'"
-                },
-                 {
-                    "question": "Show me all items created before March 15, 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE < '2022-03-15'"
-                },
-                {
-                    "question": "Get the items with the highest and lowest prices, along with their descriptions",
-                    "sql": "SELECT PART_NUMBER, DESCRIPTION, ACTUAL_PRICE FROM vMTL_SYSTEM_ITEMS ORDER BY ACTUAL_PRICE DESC FETCH FIRST 1 ROWS ONLY UNION ALL SELECT PART_NUMBER, DESCRIPTION, ACTUAL_PRICE FROM vMTL_SYSTEM_ITEMS ORDER BY ACTUAL_PRICE ASC FETCH FIRST 1 ROWS ONLY"
-                },
-                {
-                    "question": "Show the total number of items ordered by each buyer along with their total cost",
-                    "sql": "SELECT BUYER_NAME, COUNT(*) AS TOTAL_ITEMS, SUM(ACTUAL_PRICE) AS TOTAL_COST FROM vMTL_SYSTEM_ITEMS GROUP BY BUYER_NAME"
-                },
-                {
-                    "question": "Get all items from a particular catalog and show their buyer's name, price, and planning make-buy code",
-                    "sql": "SELECT BUYER_NAME, ACTUAL_PRICE, PLANNING_MAKE_BUY_CODE_NAME FROM vMTL_SYSTEM_ITEMS WHERE CATALOG_GROUP_ID = :catalog_id"
-                },
-                {
-                    "question": "Get all items created in the last year",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "List all items updated after December 31, 2023",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE > '2023-12-31'"
-                },
-                {
-                    "question": "Get all items where the cost of sales account matches the expense account",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE COST_OF_SALES_ACCOUNT = EXPENSE_ACCOUNT"
-                },
-                {
-                    "question": "List all items created in the summer of 2021",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2021-06-01' AND CREATION_DATE <= '2021-08-31'"
-                },
-                {
-                    "question": "Show me all distinct item types and their names",
-                    "sql": "SELECT DISTINCT ITEM_TYPE, ITEM_TYPE_NAME FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Get all items where the category is Mechanical",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CATEGORY_NAME = 'Mechanical'"
-                },
-                {
-                    "question": "Get all items created on or after January 1st, 2024",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE > '2024-01-01'"
-                },
-                {
-                    "question": "Get all descriptions of items",
-                    "sql": "SELECT DESCRIPTION FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "Find items that were both created and last updated in 2024",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "Show all parts created in 2024",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2024-01-01' AND CREATION_DATE <= '2024-12-31'"
-                },
-                {
-                    "question": "Find all parts that were created in the same month as today",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2025-04-01' AND CREATION_DATE < '2025-05-01'"
-                },
-                  {
-                    "question": "List all items with a price greater than 100",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE LIST_PRICE > 100"
-                },
-                {
-                    "question": "Get the items with the highest inventory levels by warehouse location",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS ORDER BY INVENTORY_QUANTITY DESC"
-                },
-                {
-                    "question": "Find all parts that were created in the same month as today",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2025-04-01' AND CREATION_DATE < '2025-05-01'"
-                },
-                {
-                    "question": "Find all items created in the month of January 2022",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '2022-01-01' AND CREATION_DATE < '2022-02-01'"
-                },
-                {
-                    "question": "List all items that have been recently updated and their corresponding inventory status",
-                    "sql": "SELECT PART_NUMBER, INVENTORY_ITEM_STATUS_CODE, LAST_UPDATE_DATE FROM vMTL_SYSTEM_ITEMS WHERE LAST_UPDATE_DATE >= '2024-12-01'"
-                },
-                {
-                    "question": "Find all items with fixed lead time",
-                    "sql": "SELECT * FROM vMTL_SYSTEM_ITEMS WHERE FIXED_LEAD_TIME_FLAG = 'Y'"
-                },
-                {
-                    "question": "Get all items with their planning time fence, orderable flag, and backorderable flag",
-                    "sql": "SELECT PART_NUMBER, PLANNING_TIME_FENCE_CODE, ORDERABLE_FLAG, BACKORDERABLE_FLAG FROM vMTL_SYSTEM_ITEMS"
-                },
-                {
-                    "question": "List all unique suppliers",
-                    "sql": "SELECT DISTINCT SUPPLIER FROM vMTL_SYSTEM_ITEMS WHERE SUPPLIER IS NOT NULL"
-                },
-                {
-                    "question": "List all items, their corresponding cost of sales account, and the total quantity ordered",
-                    "sql": "SELECT PART_NUMBER, COST_OF_SALES_ACCOUNT, SUM(QUANTITY_ORDERED) AS TOTAL_ORDERED FROM vMTL_SYSTEM_ITEMS GROUP BY PART_NUMBER, COST_OF_SALES_ACCOUNT"
-                }
-                ]
+            # Use the built-in sample data
+            data = _read_json(DEFAULT_TRAINING_DATA_FILE)
+
+        # Drop repeated questions (case-insensitive), keeping the first occurrence
+        examples = {}
+        for item in data:
+            examples.setdefault(item["question"].lower(), item)
+        duplicates = len(data) - len(examples)
+        if duplicates:
+            self.logger.warning(f"Dropped {duplicates} duplicate questions from the training data")
 
-        # Load feedback data and append to the existing data
+        # Load feedback data; a correction replaces any existing example for its question
         feedback_data = self.feedback_data.get("feedback", [])
         for feedback in feedback_data:
             if "question" in feedback and "corrected_sql" in feedback:
-                data.append({
+                examples[feedback["question"].lower()] = {
                     "question": feedback["question"],
                     "sql": feedback["corrected_sql"]
-                })
+                }
 
         # Convert to Dataset
-        dataset = Dataset.from_list(data)
+        dataset = Dataset.from_list(list(examples.values()))
         
         # Split into train and test
         train_test = dataset.train_test_split(test_size=0.2, seed=42)
         
+        if use_default_data:
+            self._cached_dataset = train_test
         return train_test
     
     def initialize_model(self):
         """Initialize the tokenizer and model"""
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+        # Left uncompiled: this is the training model, and train() has the Trainer
+        # compile it on CUDA (torch_compile); compiling here as well would wrap it twice
         self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
         self.model.to(self.device)
         
-    def preprocess_data(self, examples):
-        """Tokenize and prepare the data for training"""
-        # Use a clearer instruction prompt with schema information
-        schema_info = """
-        Tables:
-        - parts (part_number, description, price, weight, er_code, supplier_id, engineer_id, creation_date, modification_date, last_order_date, category, status)
-        - inventory (part_number, quantity, location, update_date, last_count_date)
-        - suppliers (id, supplier_name, contact, contract_date)
-        - engineers (id, name, department, hire_date)
-        """
+    @staticmethod
+    def preprocess_data(examples, tokenizer, prefix_ids, max_input_length, max_target_length):
+        """Tokenize and prepare the data for training.
         
-        inputs = [f"{schema_info}\nConvert this question to SQL: {question}" for question in examples["question"]]
+        A staticmethod so that dataset.map can pickle it for worker processes
+        without dragging the model along; bind the arguments with functools.partial.
+        """
         targets = examples["sql"]
         
-        # Tokenize inputs
-        model_inputs = self.tokenizer(
-            inputs, 
-            max_length=self.max_input_length, 
-            truncation=True, 
-            padding="max_length"
-        )
+        # Tokenize only the questions and prepend the shared prompt tokens. The leading
+        # space matches how the question follows "SQL:" in the full prompt; byte-level BPE
+        # never merges across that boundary, so the ids equal tokenizing the whole prompt
+        question_ids = tokenizer(
+            [f" {question}" for question in examples["question"]],
+            add_special_tokens=False
+        )["input_ids"]
+        
+        # Truncate like the tokenizer would, keeping room for the special tokens;
+        # padding is left to the data collator, per batch
+        max_content_length = max_input_length - tokenizer.num_special_tokens_to_add()
+        input_ids = [
+            tokenizer.build_inputs_with_special_tokens((prefix_ids + ids)[:max_content_length])
+            for ids in question_ids
+        ]
+        model_inputs = {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(ids) for ids in input_ids],
+            # Precomputed so the Trainer's length-grouped sampler need not scan input_ids
+            "input_length": [len(ids) for ids in input_ids]
+        }
         
-        # Tokenize targets
-        labels = self.tokenizer(
+        # Tokenize targets (unpadded, so there are no pad tokens to mask out of the loss here)
+        labels = tokenizer(
             targets, 
-            max_length=self.max_target_length, 
-            truncation=True, 
-            padding="max_length"
+            max_length=max_target_length, 
+            truncation=True
         )
         
         model_inputs["labels"] = labels["input_ids"]
         
-        # Replace padding token id's of the labels by -100 so they're ignored in the loss
-        model_inputs["labels"] = [
-            [-100 if token == self.tokenizer.pad_token_id else token for token in label]
-            for label in model_inputs["labels"]
-        ]
-        
         return model_inputs
     
+    def _prompt_prefix_ids(self):
+        """Token ids of the training prompt prefix, tokenized once per tokenizer"""
+        if self._prefix_ids is None:
+            self._prefix_ids = self.tokenizer(TRAINING_PROMPT_PREFIX, add_special_tokens=False)["input_ids"]
+        return self._prefix_ids
+    
+    def _input_prompt_prefix_ids(self):
+        """Token ids of the generate_sql prompt prefix, tokenized once per tokenizer and schema"""
+        if self._input_prefix_ids is None:
+            self._input_prefix_ids = self.tokenizer(self._input_text_prefix, add_special_tokens=False)["input_ids"]
+        return self._input_prefix_ids
+    
+    def _tokenized_cache_files(self, dataset):
+        """Arrow cache file per split, keyed by the split contents and tokenization settings.
+        
+        Files from earlier runs are removed, so the cache holds only the current splits.
+        """
+        settings = json.dumps([
+            self.tokenizer.name_or_path,
+            self.max_input_length,
+            self.max_target_length,
+            TRAINING_PROMPT_PREFIX,
+            TOKENIZATION_VERSION
+        ])
+        os.makedirs(TOKENIZED_CACHE_DIR, exist_ok=True)
+        
+        cache_files = {}
+        for split, split_data in dataset.items():
+            digest = hashlib.sha256(settings.encode("utf-8"))
+            # list(): newer datasets versions return a lazy Column, which json cannot encode
+            digest.update(json.dumps([list(split_data["question"]), list(split_data["sql"])]).encode("utf-8"))
+            cache_files[split] = os.path.join(TOKENIZED_CACHE_DIR, f"{split}_{digest.hexdigest()[:16]}.arrow")
+        
+        # Anything else was tokenized from older data or settings and would never be read again.
+        # Match on the file stem: with num_proc, map writes shards named {stem}_00000_of_0000N.arrow
+        current_stems = tuple(os.path.splitext(os.path.basename(path))[0] for path in cache_files.values())
+        with os.scandir(TOKENIZED_CACHE_DIR) as entries:
+            for entry in entries:
+                if not entry.name.startswith(current_stems) and entry.is_file():
+                    os.remove(entry.path)
+        return cache_files
+    
     def compute_metrics(self, eval_preds):
         """Compute evaluation metrics"""
-        metric = evaluate.load("sacrebleu")
+        # Load the BLEU metric once per instance rather than on every evaluation
+        if self._bleu is None:
+            self._bleu = evaluate.load("sacrebleu")
         
         preds, labels = eval_preds
         
@@ -716,30 +597,57 @@ class TextToSQLModel:
         # BLEU expects a list of references for each prediction
         formatted_refs = [[ref] for ref in decoded_labels]
         
-        result = metric.compute(predictions=decoded_preds, references=formatted_refs)
+        result = self._bleu.compute(predictions=decoded_preds, references=formatted_refs)
         
-        # Add exact match score
-        exact_matches = sum(1 for pred, label in zip(decoded_preds, decoded_labels) if pred.strip() == label.strip())
-        result["exact_match"] = exact_matches / len(decoded_preds)
+        # Add exact match score, comparing the stripped strings element-wise
+        preds_arr = np.char.strip(np.asarray(decoded_preds, dtype=str))
+        labels_arr = np.char.strip(np.asarray(decoded_labels, dtype=str))
+        result["exact_match"] = float((preds_arr == labels_arr).mean())
         
         return result
     
     def train(self, dataset, output_dir="./results", num_epochs=20, batch_size=8, learning_rate=2e-5):
         """Train the model with improved parameters"""
-        # Tokenize datasets
+        # Bind the tokenization settings to the (picklable) preprocessing function
+        preprocess = functools.partial(
+            self.preprocess_data,
+            tokenizer=self.tokenizer,
+            prefix_ids=self._prompt_prefix_ids(),
+            max_input_length=self.max_input_length,
+            max_target_length=self.max_target_length
+        )
+        
+        # Tokenize in parallel when there is at least a batch of work per process
+        map_batch_size = 1000
+        largest_split = max(len(split_data) for split_data in dataset.values())
+        num_proc = min((os.cpu_count() or 1) // 2, largest_split // map_batch_size)
+        
+        # Tokenize datasets, reusing the on-disk Arrow cache when nothing has changed
         tokenized_datasets = dataset.map(
-            self.preprocess_data, 
+            preprocess, 
             batched=True, 
-            remove_columns=dataset["train"].column_names
+            batch_size=map_batch_size,
+            num_proc=num_proc if num_proc > 1 else None,
+            remove_columns=dataset["train"].column_names,
+            load_from_cache_file=True,
+            cache_file_names=self._tokenized_cache_files(dataset)
         )
         
-        # Data collator
+        # Data collator: pads each batch to its longest sequence (rounded up to a multiple
+        # of 8 for tensor cores) and pads labels with -100 so padding is ignored in the loss
         data_collator = DataCollatorForSeq2Seq(
             tokenizer=self.tokenizer,
             model=self.model,
-            padding=True
+            padding=True,
+            pad_to_multiple_of=8,
+            label_pad_token_id=-100
         )
         
+        # Mixed precision: bf16 (and TF32 matmuls) on Ampere or newer, fp16 on older GPUs
+        use_cuda = self.device.type == "cuda"
+        use_bf16 = use_cuda and torch.cuda.is_bf16_supported()
+        num_workers = (os.cpu_count() or 1) // 2
+        
         # Training arguments with better parameters
         training_args = Seq2SeqTrainingArguments(
             output_dir=output_dir,
@@ -751,15 +659,24 @@ class TextToSQLModel:
             weight_decay=0.01,
             save_total_limit=3,
             num_train_epochs=num_epochs,
-            predict_with_generate=True,
-            fp16=torch.cuda.is_available(),
+            predict_with_generate=False,  # Epoch evals only need eval_loss; generate once at the end
+            fp16=use_cuda and not use_bf16,
+            bf16=use_bf16,
+            tf32=use_bf16 or None,  # Leave TF32 untouched where the GPU does not support it
+            optim="adamw_torch_fused" if use_cuda else "adamw_torch",  # Fused kernel on CUDA
+            gradient_checkpointing=True,  # Recompute activations in backward to save memory
+            dataloader_num_workers=num_workers,
+            dataloader_pin_memory=use_cuda,
+            dataloader_persistent_workers=num_workers > 0,
+            torch_compile=use_cuda,  # Let the Trainer compile the model for training
             report_to="none",
             logging_steps=10,
             generation_max_length=self.max_target_length,
-            generation_num_beams=5,
             load_best_model_at_end=True,  # Load the best model at the end of training
             metric_for_best_model="eval_loss",  # Metric to monitor for early stopping
-            greater_is_better=False  # Lower loss is better
+            greater_is_better=False,  # Lower loss is better
+            group_by_length=True,  # Batch similar-length examples together to minimise padding
+            length_column_name="input_length"
         )
         
         # Initialize trainer with early stopping
@@ -769,12 +686,44 @@ class TextToSQLModel:
             train_dataset=tokenized_datasets["train"],
             eval_dataset=tokenized_datasets["test"],
             data_collator=data_collator,
-            compute_metrics=self.compute_metrics,
             callbacks=[EarlyStoppingCallback(early_stopping_patience=8, early_stopping_threshold=0.01)]  # Increased patience and set a threshold
         )
         
-        # Train model
-        trainer.train()
+        # The KV cache is useless with gradient checkpointing (which recomputes the
+        # forward pass), but generation needs it back before the model is saved
+        self.model.config.use_cache = False
+        try:
+            # Train model
+            trainer.train()
+        finally:
+            self.model.config.use_cache = True
+        
+        # One beam-search evaluation of the best model, with BLEU and exact match. It gets
+        # its own arguments and trainer rather than changing the training ones, and has no
+        # early stopping callback to look for eval_loss among the "final_" metrics
+        final_eval_args = Seq2SeqTrainingArguments(
+            output_dir=output_dir,
+            per_device_eval_batch_size=batch_size,
+            predict_with_generate=True,
+            generation_max_length=self.max_target_length,
+            generation_num_beams=5,
+            fp16=use_cuda and not use_bf16,
+            bf16=use_bf16,
+            dataloader_num_workers=num_workers,
+            dataloader_pin_memory=use_cuda,
+            report_to="none"
+        )
+        final_trainer = Seq2SeqTrainer(
+            model=self.model,
+            args=final_eval_args,
+            data_collator=data_collator,
+            compute_metrics=self.compute_metrics
+        )
+        final_metrics = final_trainer.evaluate(
+            eval_dataset=tokenized_datasets["test"],
+            metric_key_prefix="final"
+        )
+        self.logger.info(f"Final evaluation: {final_metrics}")
         
         # Save model
         self.model.save_pretrained(os.path.join(output_dir, "final_model"))
@@ -784,23 +733,68 @@ class TextToSQLModel:
     
     def _load_feedback_data(self):
         """Load existing feedback data or create new file"""
+        feedback_data = {"examples": [], "corrections": [], "metadata": {"last_updated": None, "last_retrained": None}}
+        
         if os.path.exists(self.feedback_file):
             try:
-                with open(self.feedback_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
+                stored = _read_json(self.feedback_file)
+            except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
                 self.logger.warning(f"Could not parse {self.feedback_file}, creating new feedback file")
-                return {"examples": [], "corrections": [], "metadata": {"last_updated": None, "last_retrained": None}}
-        else:
-            return {"examples": [], "corrections": [], "metadata": {"last_updated": None, "last_retrained": None}}
+                stored = {}
+            feedback_data["metadata"] = stored.get("metadata", feedback_data["metadata"])
+            
+            # Older feedback files keep the records inline; move them to the JSON Lines files.
+            # Each file is rewritten through a temporary file, and records it already holds
+            # are skipped, so a migration interrupted before the JSON is rewritten can rerun
+            if stored.get("corrections") or stored.get("examples"):
+                for kind, path in self._feedback_log_files.items():
+                    lines = []
+                    if os.path.exists(path):
+                        with open(path, 'rb') as f:
+                            lines = f.readlines()
+                        if lines and not lines[-1].endswith(b"\n"):
+                            lines[-1] += b"\n"
+                    present = set(lines)
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.writelines(lines)
+                        f.writelines(line for line in map(_json_line, stored.get(kind, [])) if line not in present)
+                    os.replace(tmp_path, path)
+                _write_json(self.feedback_file, {"metadata": feedback_data["metadata"]})
+                self.logger.info(f"Moved feedback records from {self.feedback_file} to JSON Lines files")
+        
+        for kind, path in self._feedback_log_files.items():
+            if os.path.exists(path):
+                feedback_data[kind].extend(_read_jsonl(path))
+        return feedback_data
     
     def _save_feedback_data(self):
-        """Save feedback data to file"""
+        """Save feedback metadata to file (records are appended as they are added)"""
         self.feedback_data["metadata"]["last_updated"] = datetime.datetime.now().isoformat()
-        with open(self.feedback_file, 'w') as f:
-            json.dump(self.feedback_data, f, indent=2)
+        _write_json(self.feedback_file, {"metadata": self.feedback_data["metadata"]})
         self.logger.info(f"Feedback data saved to {self.feedback_file}")
     
+    def _append_feedback(self, kind, record):
+        """Add a correction or example record, appending it to its JSON Lines file"""
+        self.feedback_data[kind].append(record)
+        self.feedback_data["metadata"]["last_updated"] = record["timestamp"]
+        
+        handle = self._feedback_log_handles.get(kind)
+        if handle is None:
+            handle = self._feedback_log_handles[kind] = open(self._feedback_log_files[kind], 'ab')
+            atexit.register(handle.close)
+        handle.write(_json_line(record))
+        handle.flush()
+        
+        self._cached_dataset = None  # load_data merges feedback, so its split is stale
+    
+    def close(self):
+        """Close the feedback JSON Lines files (they are reopened on the next append)"""
+        for handle in self._feedback_log_handles.values():
+            atexit.unregister(handle.close)
+            handle.close()
+        self._feedback_log_handles.clear()
+    
     def add_correction(self, question, generated_sql, corrected_sql, user_id=None):
         """Add a user correction to the feedback data"""
         correction = {
@@ -811,11 +805,11 @@ class TextToSQLModel:
             "user_id": user_id
         }
         
-        self.feedback_data["corrections"].append(correction)
-        self._save_feedback_data()
+        self._append_feedback("corrections", correction)
+        self._corrections_by_q[question.lower()] = corrected_sql
         
         # Update performance metrics
-        self.performance_metrics["user_corrected"] += 1
+        self.perf.user_corrected += 1
         
         self.logger.info(f"Added correction for question: {question}")
         
@@ -835,54 +829,52 @@ class TextToSQLModel:
             "user_id": user_id
         }
         
-        self.feedback_data["examples"].append(example)
-        self._save_feedback_data()
+        self._append_feedback("examples", example)
         
         self.logger.info(f"Added new example: {question} -> {sql}")
         return True
     
     def prepare_retraining_data(self):
         """Prepare data for retraining from feedback"""
-        # Convert corrections to training examples
+        # The latest correction for each (lowercased) question, as used by generate_sql
+        latest_corrections = {}
         for correction in self.feedback_data["corrections"]:
-            # Only add if this correction hasn't been converted to an example yet
-            if not any(ex["question"] == correction["question"] and 
-                      ex["source"] == "correction" for ex in self.feedback_data["examples"]):
+            latest_corrections[correction["question"].lower()] = correction
+        
+        # SQL of the latest example converted from a correction, per question
+        converted = {
+            ex["question"].lower(): ex["sql"]
+            for ex in self.feedback_data["examples"] if ex["source"] == "correction"
+        }
+        
+        # Convert corrections to training examples; a newer correction for a question is
+        # added again, so it becomes the latest example and wins in combined_examples below
+        for key, correction in latest_corrections.items():
+            if converted.get(key) != correction["corrected_sql"]:
                 self.add_example(
                     question=correction["question"],
                     sql=correction["corrected_sql"],
                     source="correction"
                 )
         
-        # Prepare dataset from all examples
-        examples = [{"question": ex["question"], "sql": ex["sql"]} 
-                   for ex in self.feedback_data["examples"]]
-        
-        # Get ALL original training data (both train and test splits)
-        original_data = self.load_data(data_list=None)
-        original_examples = []
+        # Get ALL original training data (built once, not re-split on every retrain)
+        original_examples = self.original_examples
         
-        # Include both train and test examples from original data
-        for split in ["train", "test"]:
-            for item in original_data[split]:
-                original_examples.append({"question": item["question"], "sql": item["sql"]})
+        # Combine datasets with priority to user corrections, one example per question
+        # (case-insensitive, as in load_data)
+        combined_examples = {}
         
-        # Combine datasets with priority to user corrections
-        combined_examples = []
-        seen_questions = set()
-        
-        # First add user examples (they take precedence)
-        for ex in examples:
-            combined_examples.append(ex)
-            seen_questions.add(ex["question"])
+        # First add user examples (they take precedence; the latest one for a question wins)
+        for ex in self.feedback_data["examples"]:
+            combined_examples[ex["question"].lower()] = {"question": ex["question"], "sql": ex["sql"]}
         
         # Then add original examples that don't conflict
         for ex in original_examples:
-            if ex["question"] not in seen_questions:
-                combined_examples.append(ex)
+            combined_examples.setdefault(ex["question"].lower(), ex)
         
-        # Create dataset
-        dataset = Dataset.from_list(combined_examples)
+        # Explicit features skip type inference (the examples are already in memory, so
+        # from_list rather than from_generator, which would also write a cache copy)
+        dataset = Dataset.from_list(list(combined_examples.values()), features=EXAMPLE_FEATURES)
         train_test = dataset.train_test_split(test_size=0.2, seed=42)
         
         return train_test
@@ -899,11 +891,17 @@ class TextToSQLModel:
         datasets = self.prepare_retraining_data()
         
         # Initialize model if needed
-        if self.model is None or self.tokenizer is None:
+        # Load full-precision weights for training rather than the lazy inference model
+        if self._model is None or self._tokenizer is None:
             self.initialize_model()
+        elif self._model_source is not None:
+            # Inference weights may be half precision or INT8; reload them in FP32
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(self._model_source)
+            self.model.to(self.device)
         
         # Train model with fewer epochs since we're fine-tuning
         trainer = self.train(datasets, output_dir=output_dir)
+        self._ort_model = None  # generate with the retrained model from now on
         
         # After successful training, update the metadata
         self.feedback_data["metadata"]["last_retrained"] = datetime.datetime.now().isoformat()
@@ -917,28 +915,20 @@ class TextToSQLModel:
     
     def analyze_performance(self):
         """Analyze model performance based on feedback"""
-        if self.performance_metrics["total_queries"] > 0:
-            self.performance_metrics["success_rate"] = 1.0 - (
-                self.performance_metrics["user_corrected"] / self.performance_metrics["total_queries"]
-            )
-        
-        # Identify common error patterns
-        error_patterns = {}
-        for correction in self.feedback_data["corrections"]:
-            # Simple error categorization
-            if "WHERE" not in correction["generated_sql"] and "WHERE" in correction["corrected_sql"]:
-                error_patterns.setdefault("missing_where_clause", 0)
-                error_patterns["missing_where_clause"] += 1
-            elif "=" in correction["corrected_sql"] and "=" not in correction["generated_sql"]:
-                error_patterns.setdefault("missing_equality_operator", 0)
-                error_patterns["missing_equality_operator"] += 1
-            elif "'" in correction["corrected_sql"] and "'" not in correction["generated_sql"]:
-                error_patterns.setdefault("missing_quotes", 0)
-                error_patterns["missing_quotes"] += 1
+        perf = self.perf
+        if perf.total_queries > 0:
+            perf.success_rate = 1.0 - perf.user_corrected / perf.total_queries
+        
+        # Identify common error patterns in a single pass over the corrections
+        error_patterns = Counter(
+            _classify_correction(correction["generated_sql"], correction["corrected_sql"])
+            for correction in self.feedback_data["corrections"]
+        )
+        del error_patterns[None]  # corrections that fit no category
         
         return {
-            "metrics": self.performance_metrics,
-            "error_patterns": error_patterns,
+            "metrics": asdict(perf),
+            "error_patterns": dict(error_patterns),
             "feedback_stats": {
                 "total_corrections": len(self.feedback_data["corrections"]),
                 "total_examples": len(self.feedback_data["examples"]),
@@ -946,11 +936,119 @@ class TextToSQLModel:
             }
         }
     
+    @property
+    def schema(self):
+        """Database schema used for prompts, pattern matching and post-processing"""
+        return self._schema
+    
+    @schema.setter
+    def schema(self, value):
+        self._schema = value
+        self._schema_changed()
+    
+    def _schema_changed(self):
+        """Rebuild everything derived from the schema.
+        
+        Runs whenever the schema is assigned; call it again after mutating the schema in place.
+        """
+        self._compile_patterns()
+        
+        # Prompt text for generate_sql, so a query only has to append its question;
+        # its token ids are built from it on the next model query
+        self._schema_info_cache = self._build_schema_info()
+        self._input_text_prefix = f"{self._schema_info_cache}\nConvert this question to SQL. Use proper SQL syntax with quotes for string values:"
+        self._input_prefix_ids = None
+        
+        # Post-processing depends only on the SQL, the question and the schema, so results
+        # are memoized until the schema changes (repeated questions, evaluation reruns)
+        self._post_process_cached = functools.lru_cache(maxsize=4096)(self._post_process_uncached)
+    
+    def _compile_patterns(self):
+        """Precompile the regexes built from schema table and column names"""
+        # Code/ID lookups, per table: (table_name, table_info, [(column, pattern)]), with
+        # None in place of the list for malformed tables so callers can warn about them
+        self._code_patterns = []
+        self._id_value_patterns = []  # as above with the lowercased table name, well-formed tables only
+        case_fixes = []  # (wrongly cased name, correctly cased name), in the order they apply
+        self._quote_patterns = []  # (column, pattern) for columns that hold strings
+        
+        # Flat per-table lookups, so matching a question never walks the schema dicts
+        self._primary_keys = {}  # table name -> primary key column
+        self._sort_columns = []  # (table name, lowercased, first name-like column) for alphabetical listings
+        self._group_columns = []  # (table name, lowercased, [(column, column as worded in a question)])
+        self._all_columns = []  # (lowercased column, column, table name) across all tables
+        for table_name, table_info in self.schema["tables"].items():
+            if not isinstance(table_info, dict):
+                self._code_patterns.append((table_name, table_info, None))
+                continue
+            
+            self._primary_keys[table_name] = table_info.get("primary_key")
+            sort_column = next((column for column in table_info["columns"] if "name" in column.lower()), None)
+            if sort_column:
+                self._sort_columns.append((table_name, table_name.lower(), sort_column))
+            self._group_columns.append((table_name, table_name.lower(), [(column, column.replace("_", " ")) for column in table_info["columns"]]))
+            self._all_columns.extend((column.lower(), column, table_name) for column in table_info["columns"])
+            
+            code_columns = [column for column in table_info["columns"] if "code" in column.lower() or "id" in column.lower()]
+            self._code_patterns.append((table_name, table_info, [
+                (column, _compile_schema_re(fr'(?:with|has) {re.escape(column.replace("_", " "))} (\w+)', re.IGNORECASE))
+                for column in code_columns
+            ]))
+            self._id_value_patterns.append((table_name, table_name.lower(), table_info, [
+                (column, _compile_schema_re(f'{column.replace("_", " ")} (\\w+)', re.IGNORECASE))
+                for column in code_columns
+            ]))
+            
+            for name in [table_name, *table_info["columns"]]:
+                case_fixes.append((name.upper(), name))
+                case_fixes.append((name.title(), name))
+            
+            for column in table_info["columns"]:
+                # Skip numeric columns
+                if any(term in column.lower() for term in _NUMERIC_COLUMN_TERMS):
+                    continue
+                self._quote_patterns.append((column, _compile_schema_re(f"{column} = (\\w+)")))
+        
+        # Comparisons on the primary quantity column
+        self._quantity_patterns = None
+        quantity_columns = self.schema.get("patterns", {}).get("quantity_columns", [])
+        if quantity_columns:
+            quantity_parts = quantity_columns[0].split('.')
+            if len(quantity_parts) == 2:
+                quantity_in_question = re.escape(quantity_parts[1].replace("_", " "))
+                self._quantity_patterns = (
+                    _compile_schema_re(fr'{quantity_in_question} less than (\d+)'),
+                    _compile_schema_re(fr'{quantity_in_question} more than (\d+)')
+                )
+        
+        # Schema-defined replacements, applied after the case fixes
+        case_fixes.extend(
+            (format_rule["from"], format_rule["to"])
+            for format_rule in self.schema.get("patterns", {}).get("special_formatting", [])
+            if isinstance(format_rule, dict) and "from" in format_rule and "to" in format_rule
+        )
+        
+        # One word-bounded alternation over every name to fix, instead of one re.sub per
+        # rule. Each name maps to what the rules would leave of it when applied one after
+        # another (a later rule can rewrite an earlier rule's output); names the rules
+        # leave alone are dropped. Longest first, so a name wins over its own prefix.
+        self._case_fix_map = {}
+        for wrong, _ in case_fixes:
+            fixed = wrong
+            for rule_from, rule_to in case_fixes:
+                if fixed == rule_from:
+                    fixed = rule_to
+            if fixed != wrong:
+                self._case_fix_map[wrong] = fixed
+        self._case_fix_re = None
+        if self._case_fix_map:
+            names = sorted(self._case_fix_map, key=len, reverse=True)
+            self._case_fix_re = _compile_schema_re(r'\b(?:' + '|'.join(map(re.escape, names)) + r')\b')
+    
     def _load_schema(self, schema_file):
         """Load database schema from configuration file"""
         if os.path.exists(schema_file):
-            with open(schema_file, 'r') as f:
-                return json.load(f)
+            return _read_json(schema_file)
         else:
             # Default schema if file doesn't exist
             return {
@@ -994,100 +1092,138 @@ class TextToSQLModel:
             }
     
     def _get_schema_info(self):
+        """Schema information for the prompt (built once per schema)"""
+        return self._schema_info_cache
+    
+    def _build_schema_info(self):
         """Generate schema information for the prompt"""
-        schema_info = "Tables:\n"
+        lines = ["Tables:"]
         for table_name, table_info in self.schema["tables"].items():
             if isinstance(table_info, dict) and "columns" in table_info:
                 columns = ", ".join(table_info["columns"])
-                schema_info += f"- {table_name} ({columns})\n"
-        return schema_info
+                lines.append(f"- {table_name} ({columns})")
+        return "\n".join(lines) + "\n"
     
-    def generate_sql(self, question):
+    def generate_sql(self, question, max_tokens=None):
         """Generate SQL from a natural language question"""
-        # Update metrics
-        self.performance_metrics["total_queries"] += 1
+        return self.generate_sql_batch([question], max_tokens=max_tokens)[0]
+    
+    def generate_sql_batch(self, questions, max_tokens=None):
+        """Generate SQL for several questions, running the model once for all of them.
         
-        # Ensure model is on the right device
-        self.model.to(self.device)
+        max_tokens overrides max_target_length as the output length limit, e.g. for long queries.
+        """
+        results = [None] * len(questions)
+        model_indices = []  # questions left over for the model
         
-        # First try pattern matching for common query types
-        sql_query = self._pattern_match_sql(question)
-        if sql_query:
+        for i, question in enumerate(questions):
             # Update metrics
-            self.performance_metrics["pattern_matched"] += 1
+            self.perf.total_queries += 1
             
-            # Log the pattern-matched query
-            self.log_query(question, sql_query, success=True, method="pattern")
-            return sql_query
-        
-        # Use dynamic schema info
-        schema_info = self._get_schema_info()
-        
-        input_text = f"{schema_info}\nConvert this question to SQL. Use proper SQL syntax with quotes for string values: {question}"
-        inputs = self.tokenizer(input_text, return_tensors="pt", padding=True).to(self.device)
-        
-        # Generate output with improved parameters
-        outputs = self.model.generate(
-            **inputs, 
-            max_length=self.max_target_length,
-            num_beams=5,
-            temperature=0.3,  # Lower temperature for more focused outputs
-            top_p=0.95,
-            early_stopping=True
-        )
-        
-        # Decode and return
-        sql_query = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            # First try pattern matching for common query types
+            sql_query = self._pattern_match_sql(question)
+            if sql_query:
+                # Update metrics
+                self.perf.pattern_matched += 1
+                
+                # Log the pattern-matched query
+                self.log_query(question, sql_query, success=True, method="pattern")
+                results[i] = sql_query
+            else:
+                model_indices.append(i)
         
-        # Post-process the SQL to fix common errors
-        sql_query = self._post_process_sql(sql_query, question)
+        if not model_indices:
+            return results
         
-        # Update metrics
-        self.performance_metrics["model_generated"] += 1
+        generated = self._run_model([questions[i] for i in model_indices], max_tokens=max_tokens)
         
-        # Check if we have a correction for this exact question
-        for correction in self.feedback_data["corrections"]:
-            if correction["question"].lower() == question.lower():
+        for i, sql_query in zip(model_indices, generated):
+            question = questions[i]
+            
+            # Post-process the SQL to fix common errors
+            sql_query = self._post_process_sql(sql_query, question)
+            
+            # Update metrics
+            self.perf.model_generated += 1
+            
+            # Check if we have a correction for this exact question
+            corrected_sql = self._corrections_by_q.get(question.lower())
+            if corrected_sql is not None:
                 # Use the corrected SQL instead
-                sql_query = correction["corrected_sql"]
+                sql_query = corrected_sql
                 self.logger.info(f"Using previously corrected SQL for question: {question}")
-                break
-        
-        # Log the model-generated query
-        success = self._is_valid_sql(sql_query)
-        self.log_query(question, sql_query, success=success, method="model")
+            
+            # Log the model-generated query
+            success = self._is_valid_sql(sql_query)
+            self.log_query(question, sql_query, success=success, method="model")
+            
+            results[i] = sql_query
         
-        return sql_query
+        return results
+    
+    def _run_model(self, questions, max_tokens=None):
+        """Generate raw SQL text for questions with the model, in one batch"""
+        # Ensure model is on the right device, once per assigned model rather than on
+        # every call (Module.to walks all parameters even when they are already there)
+        if self._ort_model is None and not self._model_on_device:
+            self.model.to(self.device)
+            self._model_on_device = True
+        
+        # The prompt prefix with the schema info is tokenized once; only the questions are
+        # tokenized here (with the space that follows the prefix, as in preprocess_data)
+        prefix_ids = self._input_prompt_prefix_ids()
+        question_ids = self.tokenizer(
+            [f" {question}" for question in questions],
+            add_special_tokens=False
+        )["input_ids"]
+        input_ids = [self.tokenizer.build_inputs_with_special_tokens(prefix_ids + ids) for ids in question_ids]
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, return_tensors="pt").to(self.device)
+        
+        outputs = self._generate_ids(inputs, max_tokens or self.max_target_length)
+        
+        # Decode the whole batch at once
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _generate_ids(self, inputs, max_length):
+        """Run beam search on tokenized inputs (mixed precision on CUDA)"""
+        if self._ort_model is not None:
+            return self._ort_model.generate(**inputs, max_length=max_length, **GENERATION_KWARGS)
+        with torch.inference_mode(), torch.autocast(device_type=self.device.type, dtype=self.amp_dtype, enabled=self.use_amp):
+            return self.model.generate(
+                **inputs, 
+                max_length=max_length,
+                **GENERATION_KWARGS
+            )
+    
+    def _warm_up(self):
+        """Run one throwaway generation so torch.compile compiles before the first real query"""
+        if self.device.type != "cuda":
+            return  # nothing is compiled on CPU, see _compile_for_inference
+        self._run_model([_WARM_UP_QUESTION])
     
     def _pattern_match_sql(self, question):
         """Use pattern matching for common query types based on schema configuration"""
         question_lower = question.lower()
 
-        # Month mapping
-        month_mapping = {
-            "january": "01",
-            "february": "02",
-            "march": "03",
-            "april": "04",
-            "may": "05",
-            "june": "06",
-            "july": "07",
-            "august": "08",
-            "september": "09",
-            "october": "10",
-            "november": "11",
-            "december": "12"
-        }
+        # Every pattern below needs one of these trigger phrases: a single scan rules
+        # out questions that cannot match anything, and patterns whose trigger is absent
+        triggers = {match.lastgroup for match in _PATTERN_TRIGGER_RE.finditer(question_lower)}
+        if not triggers:
+            return None
 
         # Check for "after" and month in the question
-        for month_name, month_number in month_mapping.items():
-            if f"after {month_name}" in question_lower:
-                year_pattern = re.search(r'(\d{4})', question_lower)
-                if year_pattern:
-                    year = year_pattern.group(1)
-                    # Set the date to the first day of the next month
-                    next_month_number = str(int(month_number) + 1).zfill(2)  # Increment month
-                    return f"SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '{year}-{next_month_number}-01'"
+        after_month = "after" in triggers and _AFTER_MONTH_RE.search(question_lower)
+        if after_month:
+            year_pattern = _YEAR_RE.search(question_lower)
+            if year_pattern:
+                year = int(year_pattern.group(1))
+                # Set the date to the first day of the next month (after December: next January)
+                month_number = _MONTH_NUMBERS[after_month.group(1)]
+                if month_number == 12:
+                    year, month_number = year + 1, 1
+                else:
+                    month_number += 1
+                return f"SELECT * FROM vMTL_SYSTEM_ITEMS WHERE CREATION_DATE >= '{year:04d}-{month_number:02d}-01'"
 
         # Get schema information
         date_columns = self.schema.get("patterns", {}).get("date_columns", [])
@@ -1126,15 +1262,15 @@ class TextToSQLModel:
                 quantity_table, quantity_column = quantity_parts
 
         # Pattern for date ranges with years
-        if date_column and date_table:
-            year_pattern = re.search(r'(?:created|made|from|in) (\d{4})', question_lower)
+        if date_column and date_table and "year" in triggers:
+            year_pattern = _CREATED_YEAR_RE.search(question_lower)
             if year_pattern:
                 year = year_pattern.group(1)
 
                 # Check for category filtering
                 if category_column and category_table:
-                    category_pattern = re.search(r'(?:in|are in) the (\w+) (?:category|type|status)', question_lower)
-                    not_category_pattern = re.search(r'not in the (\w+) (?:category|type|status)', question_lower)
+                    category_pattern = _CATEGORY_RE.search(question_lower)
+                    not_category_pattern = _NOT_CATEGORY_RE.search(question_lower)
 
                     if not_category_pattern:
                         category = not_category_pattern.group(1)
@@ -1147,70 +1283,58 @@ class TextToSQLModel:
                 return f"SELECT * FROM {date_table} WHERE {date_column} >= '{year}-01-01' AND {date_column} <= '{year}-12-31'"
 
         # Pattern for items with a specific code/ID
-        for table_name, table_info in self.schema["tables"].items():
+        for table_name, table_info, code_patterns in (self._code_patterns if "with" in triggers else ()):
             # Ensure table_info is a dictionary
-            if isinstance(table_info, dict):
-                for column in table_info["columns"]:
-                    if "code" in column.lower() or "id" in column.lower():
-                        # Fix: Use raw string for regex pattern
-                        column_in_question = column.replace("_", " ")
-                        pattern = fr'(?:with|has) {re.escape(column_in_question)} (\w+)'
-                        code_pattern = re.search(pattern, question_lower, re.IGNORECASE)
-                        if code_pattern:
-                            code_value = code_pattern.group(1)
-                            # Check if we're looking for just IDs/numbers
-                            if "number" in question_lower or "id" in question_lower:
-                                primary_key = table_info.get("primary_key")
-                                if primary_key:
-                                    return f"SELECT {primary_key} FROM {table_name} WHERE {column} = '{code_value}'"
-                            return f"SELECT * FROM {table_name} WHERE {column} = '{code_value}'"
+            if code_patterns is not None:
+                for column, pattern in code_patterns:
+                    code_pattern = pattern.search(question_lower)
+                    if code_pattern:
+                        code_value = code_pattern.group(1)
+                        # Check if we're looking for just IDs/numbers
+                        if "number" in question_lower or "id" in question_lower:
+                            primary_key = table_info.get("primary_key")
+                            if primary_key:
+                                return f"SELECT {primary_key} FROM {table_name} WHERE {column} = '{code_value}'"
+                        return f"SELECT * FROM {table_name} WHERE {column} = '{code_value}'"
             else:
                 self.logger.warning(f"Expected table_info to be a dictionary for table: {table_name}, but got {type(table_info)}")
 
         # Pattern for quantity comparisons
-        if quantity_column and quantity_table:
-            # Less than pattern - Fix: Use raw string
-            quantity_in_question = quantity_column.replace("_", " ")
-            less_pattern = re.search(fr'{re.escape(quantity_in_question)} less than (\d+)', question_lower)
+        if quantity_column and quantity_table and "compare" in triggers:
+            # Less than pattern
+            quantity_less_re, quantity_more_re = self._quantity_patterns
+            less_pattern = quantity_less_re.search(question_lower)
             if less_pattern:
                 quantity = less_pattern.group(1)
                 return f"SELECT * FROM {quantity_table} WHERE {quantity_column} < {quantity}"
 
-            # More than pattern - Fix: Use raw string
-            more_pattern = re.search(fr'{re.escape(quantity_in_question)} more than (\d+)', question_lower)
+            # More than pattern
+            more_pattern = quantity_more_re.search(question_lower)
             if more_pattern:
                 quantity = more_pattern.group(1)
                 return f"SELECT * FROM {quantity_table} WHERE {quantity_column} > {quantity}"
 
             # General quantity patterns
-            more_pattern = re.search(r'more than (\d+)', question_lower)
+            more_pattern = _MORE_THAN_RE.search(question_lower)
             if more_pattern and quantity_column in question_lower:
                 quantity = more_pattern.group(1)
                 return f"SELECT * FROM {quantity_table} WHERE {quantity_column} > {quantity}"
 
         # Pattern for alphabetical listing
-        for table_name, table_info in self.schema["tables"].items():
-            if table_name.lower() in question_lower and "alphabetical" in question_lower:
-                # Find a name-like column for sorting
-                sort_column = None
-                for col in table_info["columns"]:
-                    if "name" in col.lower():
-                        sort_column = col
-                        break
-
-                if sort_column:
-                    return f"SELECT * FROM {table_name} ORDER BY {sort_column}"
+        # (sorting by the table's first name-like column)
+        for table_name, table_lower, sort_column in (self._sort_columns if "alphabetical" in triggers else ()):
+            if table_lower in question_lower:
+                return f"SELECT * FROM {table_name} ORDER BY {sort_column}"
 
         # Pattern for counting by group
-        for table_name, table_info in self.schema["tables"].items():
-            if "count" in question_lower and table_name.lower() in question_lower:
-                for col in table_info["columns"]:
-                    col_in_question = col.replace("_", " ")
+        for table_name, table_lower, group_columns in (self._group_columns if "count" in triggers else ()):
+            if table_lower in question_lower:
+                for col, col_in_question in group_columns:
                     if f"by {col_in_question}" in question_lower:
                         return f"SELECT {col}, COUNT(*) FROM {table_name} GROUP BY {col}"
 
         # Pattern for latest/max date queries
-        latest_pattern = re.search(r'(?:latest|most recent|last|newest) (\w+) (?:date|time)', question.lower())
+        latest_pattern = "latest" in triggers and _LATEST_RE.search(question_lower)
         if latest_pattern:
             date_field = latest_pattern.group(1)
 
@@ -1219,13 +1343,10 @@ class TextToSQLModel:
             table_name = None
 
             # Try to find the matching date column in the schema
-            for t_name, t_info in self.schema["tables"].items():
-                for col in t_info["columns"]:
-                    if date_field in col.lower() or col.lower() in date_field:
-                        date_column = col
-                        table_name = t_name
-                        break
-                if date_column:
+            for col_lower, col, t_name in self._all_columns:
+                if date_field in col_lower or col_lower in date_field:
+                    date_column = col
+                    table_name = t_name
                     break
 
             # If no exact match, try to find any date column
@@ -1239,16 +1360,16 @@ class TextToSQLModel:
 
             if date_column and table_name:
                 # Check if filtering for specific part/item
-                item_pattern = re.search(r'for (?:part|item) (\w+)', question.lower())
+                item_pattern = _FOR_ITEM_RE.search(question_lower)
                 if item_pattern:
                     item_id = item_pattern.group(1)
-                    primary_key = self.schema["tables"][table_name].get("primary_key")
+                    primary_key = self._primary_keys.get(table_name)
                     if primary_key:
                         return f"SELECT MAX({date_column}) as latest_{date_column} FROM {table_name} WHERE {primary_key} = '{item_id}'"
 
                 # If asking for each part/item, use GROUP BY
-                if "each" in question.lower() or "all" in question.lower():
-                    primary_key = self.schema["tables"][table_name].get("primary_key")
+                if "each" in question_lower or "all" in question_lower:
+                    primary_key = self._primary_keys.get(table_name)
                     if primary_key:
                         return f"SELECT {primary_key}, MAX({date_column}) as latest_{date_column} FROM {table_name} GROUP BY {primary_key}"
 
@@ -1256,7 +1377,7 @@ class TextToSQLModel:
                 return f"SELECT MAX({date_column}) as latest_{date_column} FROM {table_name}"
 
         # Pattern for wildcard searches
-        search_term_pattern = re.search(r'(?:containing|contains|with|has) [\'"]?(\w+)[\'"]?', question_lower)
+        search_term_pattern = ("with" in triggers or "contains" in triggers) and _SEARCH_TERM_RE.search(question_lower)
         if search_term_pattern:
             search_term = search_term_pattern.group(1)
 
@@ -1273,7 +1394,13 @@ class TextToSQLModel:
         return None
     
     def _post_process_sql(self, sql_query, question):
-        """Post-process the SQL to fix common errors using schema information"""
+        """Post-process the SQL to fix common errors using schema information (memoized)"""
+        return self._post_process_cached(sql_query, question)
+    
+    def _post_process_uncached(self, sql_query, question):
+        """Post-process the SQL to fix common errors; see _post_process_sql"""
+        question_lower = question.lower()
+        
         # Get schema information
         date_columns = self.schema.get("patterns", {}).get("date_columns", [])
         
@@ -1284,62 +1411,42 @@ class TextToSQLModel:
             if len(date_parts) == 2:
                 date_table, date_column = date_parts
                 
-                year_pattern = re.search(r'(?:created|made|from|in) (\d{4})', question.lower())
+                year_pattern = _CREATED_YEAR_RE.search(question_lower)
                 if year_pattern and date_column not in sql_query:
                     year = year_pattern.group(1)
                     # Add date condition to WHERE clause
                     if "WHERE" in sql_query:
                         sql_query = sql_query.replace("WHERE", f"WHERE {date_column} >= '{year}-01-01' AND {date_column} <= '{year}-12-31' AND")
                     else:
-                        table_match = re.search(r'FROM (\w+)', sql_query)
+                        table_match = _FROM_TABLE_RE.search(sql_query)
                         if table_match:
                             sql_query = sql_query + f" WHERE {date_column} >= '{year}-01-01' AND {date_column} <= '{year}-12-31'"
         
         # Check for negation in the question but missing in the query
         category_columns = self.schema.get("patterns", {}).get("category_columns", [])
-        if category_columns and "not in" in question.lower() and "!=" not in sql_query and "<>" not in sql_query:
+        if category_columns and "not in" in question_lower and "!=" not in sql_query and "<>" not in sql_query:
             # Extract the primary category column
             category_parts = category_columns[0].split('.')
             if len(category_parts) == 2:
                 category_table, category_column = category_parts
                 
-                category_pattern = re.search(r'not in the (\w+) (?:category|type|status)', question.lower())
+                category_pattern = _NOT_CATEGORY_RE.search(question_lower)
                 if category_pattern and category_column in sql_query:
                     category = category_pattern.group(1)
                     sql_query = sql_query.replace(f"{category_column} = '{category}'", f"{category_column} != '{category}'")
         
-        # Fix case issues with table and column names using schema
-        for table_name, table_info in self.schema["tables"].items():
-            if isinstance(table_info, dict):  # Ensure table_info is a dictionary
-                # Fix table name case
-                sql_query = re.sub(r'\b' + re.escape(table_name.upper()) + r'\b', table_name, sql_query)
-                sql_query = re.sub(r'\b' + re.escape(table_name.title()) + r'\b', table_name, sql_query)
-                
-                # Fix column name case
-                for column in table_info["columns"]:
-                    sql_query = re.sub(r'\b' + re.escape(column.upper()) + r'\b', column, sql_query)
-                    sql_query = re.sub(r'\b' + re.escape(column.title()) + r'\b', column, sql_query)
-        
-        # Handle special formatting cases from schema
-        special_formatting = self.schema.get("patterns", {}).get("special_formatting", [])
-        for format_rule in special_formatting:
-            if isinstance(format_rule, dict) and "from" in format_rule and "to" in format_rule:
-                sql_query = re.sub(r'\b' + re.escape(format_rule["from"]) + r'\b', format_rule["to"], sql_query)
+        # Fix case issues with table and column names and apply the schema's special
+        # formatting, in a single pass
+        if self._case_fix_re is not None:
+            sql_query = self._case_fix_re.sub(lambda match: self._case_fix_map[match.group(0)], sql_query)
         
         # Ensure string values are properly quoted for all columns that might need it
-        for table_name, table_info in self.schema["tables"].items():
-            if isinstance(table_info, dict):  # Ensure table_info is a dictionary
-                for column in table_info["columns"]:
-                    # Skip numeric columns
-                    if any(term in column.lower() for term in ["price", "quantity", "amount", "count", "number", "id"]):
-                        continue
-                    
-                    # Add quotes to string values
-                    pattern = f"{column} = (\\w+)"
-                    match = re.search(pattern, sql_query)
-                    if match and "'" not in match.group(0):
-                        value = match.group(1)
-                        sql_query = sql_query.replace(f"{column} = {value}", f"{column} = '{value}'")
+        for column, pattern in self._quote_patterns:
+            # Add quotes to string values
+            match = pattern.search(sql_query)
+            if match and "'" not in match.group(0):
+                value = match.group(1)
+                sql_query = sql_query.replace(f"{column} = {value}", f"{column} = '{value}'")
         
         # Fix common syntax errors
         if "SELECT" not in sql_query and "select" in sql_query:
@@ -1354,74 +1461,75 @@ class TextToSQLModel:
         # Check if the query is completely wrong and try to fix based on the question
         if "SELECT" not in sql_query and "FROM" not in sql_query:
             # Try to extract key information from the question
-            for table_name, table_info in self.schema["tables"].items():
-                if isinstance(table_info, dict):  # Ensure table_info is a dictionary
-                    if table_name.lower() in question.lower():
-                        # Find a potential ID or code column
-                        id_column = None
-                        for col in table_info["columns"]:
-                            if "id" in col.lower() or "code" in col.lower():
-                                id_column = col
-                                id_pattern = re.search(f'{col.replace("_", " ")} (\\w+)', question, re.IGNORECASE)
-                                if id_pattern:
-                                    id_value = id_pattern.group(1)
-                                    primary_key = table_info.get("primary_key")
-                                    if primary_key and "number" in question.lower():
-                                        return f"SELECT {primary_key} FROM {table_name} WHERE {col} = '{id_value}'"
-                                    return f"SELECT * FROM {table_name} WHERE {col} = '{id_value}'"
+            for table_name, table_lower, table_info, id_patterns in self._id_value_patterns:
+                if table_lower in question_lower:
+                    # Find a potential ID or code column
+                    for col, pattern in id_patterns:
+                        id_pattern = pattern.search(question)
+                        if id_pattern:
+                            id_value = id_pattern.group(1)
+                            primary_key = table_info.get("primary_key")
+                            if primary_key and "number" in question_lower:
+                                return f"SELECT {primary_key} FROM {table_name} WHERE {col} = '{id_value}'"
+                            return f"SELECT * FROM {table_name} WHERE {col} = '{id_value}'"
         
         # Check for latest/max date intent but missing GROUP BY
         if "MAX(" in sql_query and "GROUP BY" not in sql_query:
             # Check if the question implies grouping
-            if any(term in question.lower() for term in ["each", "every", "per", "by"]):
+            if any(term in question_lower for term in _GROUPING_TERMS):
                 # Extract table name
-                table_match = re.search(r'FROM (\w+)', sql_query)
+                table_match = _FROM_TABLE_RE.search(sql_query)
                 if table_match:
                     table_name = table_match.group(1)
                     # Find primary key for this table
-                    primary_key = self.schema["tables"].get(table_name, {}).get("primary_key")
+                    primary_key = self._primary_keys.get(table_name)
                     if primary_key:
                         # Add GROUP BY clause
                         sql_query = sql_query.rstrip(";")
                         sql_query += f" GROUP BY {primary_key}"
         
         # Simplify SELECT * or excessive column lists
+        # (rewriting only the leading SELECT's projection)
         if "SELECT" in sql_query:
-            question_lower = question.lower()
             if "just" in question_lower and "part number" in question_lower:
-                sql_query = sql_query.replace(sql_query[6:sql_query.find("FROM")], "PART_NUMBER ")
+                sql_query = _SELECT_PROJECTION_RE.sub("SELECT PART_NUMBER FROM", sql_query, count=1)
             elif "show me all" in question_lower or "list all" in question_lower:
-                sql_query = sql_query.replace(sql_query[6:sql_query.find("FROM")], "* ")
+                sql_query = _SELECT_PROJECTION_RE.sub("SELECT * FROM", sql_query, count=1)
         
         return sql_query
     
     def _is_valid_sql(self, sql_query):
         """Basic validation of SQL query"""
-        # Check for basic SQL structure
-        has_select = "SELECT" in sql_query.upper()
-        has_from = "FROM" in sql_query.upper()
+        # Check for basic SQL structure (uppercasing once), skipping the other scans if missing.
+        # str.count and `in` each scan in C, which beats a single character loop in Python
+        sql_upper = sql_query.upper()
+        if "SELECT" not in sql_upper or "FROM" not in sql_upper:
+            return False
         
         # Check for common syntax errors
         has_unbalanced_quotes = sql_query.count("'") % 2 != 0
         has_unbalanced_parentheses = sql_query.count("(") != sql_query.count(")")
         
-        return has_select and has_from and not has_unbalanced_quotes and not has_unbalanced_parentheses
+        return not has_unbalanced_quotes and not has_unbalanced_parentheses
     
-    def evaluate_model(self, test_data):
+    def evaluate_model(self, test_data, batch_size=32):
         """Evaluate the model on test data"""
         results = []
+        items = list(test_data)
         
-        for item in test_data:
-            question = item["question"]
-            expected_sql = item["sql"]
-            generated_sql = self.generate_sql(question)
+        # Generate in batches so the model runs once per batch rather than per question
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            generated = self.generate_sql_batch([item["question"] for item in batch])
             
-            results.append({
-                "question": question,
-                "expected_sql": expected_sql,
-                "generated_sql": generated_sql,
-                "is_correct": expected_sql.strip() == generated_sql.strip()
-            })
+            for item, generated_sql in zip(batch, generated):
+                expected_sql = item["sql"]
+                results.append({
+                    "question": item["question"],
+                    "expected_sql": expected_sql,
+                    "generated_sql": generated_sql,
+                    "is_correct": expected_sql.strip() == generated_sql.strip()
+                })
         
         # Calculate accuracy
         accuracy = sum(1 for r in results if r["is_correct"]) / len(results)
@@ -1433,36 +1541,74 @@ class TextToSQLModel:
     
     def save_model(self, path):
         """Save the model and tokenizer"""
-        self.model.save_pretrained(path)
+        model = self.model
+        if self._model_source is not None:
+            # An inference model may hold half precision or INT8 (quantize_dynamic) weights,
+            # which must not replace a checkpoint; save the FP32 weights it was loaded from
+            model = AutoModelForSeq2SeqLM.from_pretrained(self._model_source)
+        model.save_pretrained(path)
         self.tokenizer.save_pretrained(path)
         print(f"Model saved to {path}")
     
-    def load_model(self, path):
-        """Load a saved model and tokenizer"""
-        self.tokenizer = AutoTokenizer.from_pretrained(path)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(path)
+    def load_model(self, path, compile=True):
+        """Load a saved model and tokenizer for inference (half precision or INT8, see precision).
+        
+        compile=False skips torch.compile and its warm-up, e.g. for a one-off evaluation.
+        """
+        self.tokenizer = AutoTokenizer.from_pretrained(path, use_fast=True)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(path, torch_dtype=self.amp_dtype)
         self.model.to(self.device)
+        self.model = self._quantize_for_cpu(self.model)
+        self._model_source = path
+        if compile:
+            self._compile_for_inference(self.model)
+            self._warm_up()
+        self.loaded_model = (path, model_files_mtime(path) if os.path.isdir(path) else None)
         print(f"Model loaded from {path}")
     
+    def export_onnx(self, onnx_dir, model_path=None):
+        """Export a model (model_name by default) and its tokenizer to ONNX for load_onnx_runtime"""
+        # optimum is optional and slow to import, so it is only imported here
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        
+        model_path = model_path or self.model_name
+        ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True).save_pretrained(onnx_dir)
+        AutoTokenizer.from_pretrained(model_path, use_fast=True).save_pretrained(onnx_dir)
+        print(f"ONNX model exported to {onnx_dir}")
+    
+    def load_onnx_runtime(self, onnx_dir):
+        """Generate with an ONNX export (see export_onnx) on ONNX Runtime instead of PyTorch"""
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        
+        # Full graph optimization (fusions) and half the cores for each operator
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+        provider = "CUDAExecutionProvider" if self.device.type == "cuda" else "CPUExecutionProvider"
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir, use_fast=True)
+        self._ort_model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, provider=provider, session_options=session_options)
+        self.loaded_model = (onnx_dir, model_files_mtime(onnx_dir) if os.path.isdir(onnx_dir) else None)
+        print(f"ONNX model loaded from {onnx_dir}")
+    
     def load_most_recent_model(self):
         """Load the most recently trained model"""
         base_dir = "./text_to_sql_results"
         
-        # Find all model directories
-        model_dirs = []
-        for dir_name in os.listdir(base_dir):
-            dir_path = os.path.join(base_dir, dir_name)
-            if os.path.isdir(dir_path) and (dir_name == "final_model" or dir_name.startswith("text_to_sql_results_")):
-                # Get directory creation time
-                creation_time = os.path.getctime(dir_path)
-                model_dirs.append((dir_path, creation_time))
+        # Find all model directories (one scan; DirEntry caches its type and stat result)
+        with os.scandir(base_dir) as entries:
+            model_dirs = [
+                (entry.stat().st_mtime, entry.path) for entry in entries
+                if (entry.name == "final_model" or entry.name.startswith("text_to_sql_results_")) and entry.is_dir()
+            ]
         
         if not model_dirs:
             self.logger.warning("No trained models found. Using initial model.")
             return self.initialize_model()
         
-        # Sort by creation time and get most recent
-        most_recent_dir = sorted(model_dirs, key=lambda x: x[1], reverse=True)[0][0]
+        # Most recently modified directory
+        most_recent_dir = max(model_dirs)[1]
         self.logger.info(f"Loading most recent model from: {most_recent_dir}")
         
         # Load the model and tokenizer